@@ -0,0 +1,78 @@
+from collections import OrderedDict
+
+import pygame
+
+from assets_pygame import ImageCache
+from utils import load_asset_manifest
+
+
+class AnimationCache:
+    """Pre-baked animation frames, shared by every entity that plays them.
+
+    Frames are built once per (source, size, frame count): the sprite grows
+    from `start_scale` to full size during the first part of the animation,
+    then fades out. Each frame is a surface of the entity's size with the
+    scaled sprite centred in it, so playing the animation is just a blit of
+    the current frame; no scaling or alpha work happens while drawing.
+    """
+    max_animations = 16 # Odd sizes (whatever died) are baked on demand; keep only the recent ones
+    start_scale = 0.4
+    grow_fraction = 0.4 # Share of the frames spent growing; the rest fades out
+
+    _frames = OrderedDict() # (source, (w, h), frame_count) -> tuple of surfaces
+
+    @classmethod
+    def get(cls, source, size, frame_count=12):
+        key = (source, (int(size[0]), int(size[1])), frame_count)
+        frames = cls._frames.get(key)
+        if frames is None:
+            frames = cls._bake(*key)
+            cls._frames[key] = frames
+            while len(cls._frames) > cls.max_animations:
+                cls._frames.popitem(last=False)
+        else:
+            cls._frames.move_to_end(key)
+        return frames
+
+    @classmethod
+    def preload(cls, entries):
+        for source, size in entries:
+            cls.get(source, size)
+
+    @classmethod
+    def clear(cls):
+        cls._frames.clear()
+
+    @classmethod
+    def _bake(cls, source, size, frame_count):
+        image = ImageCache.get(source, size)
+        width, height = size
+        grow_frames = max(1, int(frame_count * cls.grow_fraction))
+        fade_frames = max(1, frame_count - grow_frames)
+        frames = []
+        for i in range(frame_count):
+            if i < grow_frames:
+                scale = cls.start_scale + (1.0 - cls.start_scale) * (i + 1) / grow_frames
+                opacity = 255
+            else:
+                scale = 1.0
+                opacity = int(255 * (1.0 - (i - grow_frames + 1) / (fade_frames + 1)))
+            scaled_size = (max(1, int(width * scale)), max(1, int(height * scale)))
+            sprite = image if scaled_size == (width, height) else pygame.transform.smoothscale(image, scaled_size)
+            frame = pygame.Surface(size, pygame.SRCALPHA).convert_alpha()
+            frame.fill((0, 0, 0, 0))
+            frame.blit(sprite, ((width - scaled_size[0]) // 2, (height - scaled_size[1]) // 2),
+                       special_flags=pygame.BLEND_RGBA_ADD) # Exact copy, as in SpriteAtlas.build
+            if opacity < 255:
+                frame.fill((255, 255, 255, opacity), special_flags=pygame.BLEND_RGBA_MULT)
+            frames.append(frame)
+        return tuple(frames)
+
+
+def manifest_animations(manifest=None):
+    """(source, size) animations baked at startup (enemy and player explosions), from assets/manifest.json."""
+    manifest = load_asset_manifest() if manifest is None else manifest
+    return [(entry['file'], tuple(entry['size'])) for entry in manifest.get('animations', [])]
+
+def preload_game_animations():
+    AnimationCache.preload(manifest_animations())
@@ -0,0 +1,210 @@
+try:
+    import numpy as np
+except ImportError: # NumPy is optional; the game falls back to per-entity updates
+    np = None
+
+# Entity kinds whose whole update is "move in a straight line, cull off-screen"
+ARRAY_KINDS = ('bullets', 'enemies', 'powerups')
+KIND_CODES = {kind: code for code, kind in enumerate(ARRAY_KINDS, start=1)}
+
+
+def array_store_available():
+    return np is not None
+
+
+class ArrayEntityStore:
+    """Struct-of-arrays storage for the simple movers (bullets, enemies, power-ups).
+
+    Positions, previous positions, velocities, sizes and kind codes live in
+    contiguous NumPy arrays, one row per entity. Each entity's `_pos` and
+    `_prev_pos` become views into its row, so the rest of the code (collision
+    rects, drawing, explosions) keeps reading them as before, while movement,
+    off-screen culling and bullet/enemy AABB tests run as single vectorized
+    operations over every row.
+    """
+    def __init__(self, capacity=1024):
+        if np is None:
+            raise RuntimeError("ArrayEntityStore requires NumPy")
+        self.capacity = 0
+        self.pos = np.zeros((0, 2))
+        self.prev = np.zeros((0, 2))
+        self.vel = np.zeros((0, 2))
+        self.size = np.zeros((0, 2))
+        self.kind = np.zeros(0, dtype=np.int8) # 0 marks a free row
+        self.entities = []
+        self._free = []
+        self.count = 0
+        self._grow(capacity)
+
+    def _grow(self, capacity):
+        old = self.capacity
+        for name in ('pos', 'prev', 'vel', 'size'):
+            array = np.zeros((capacity, 2))
+            array[:old] = getattr(self, name)
+            setattr(self, name, array)
+        kind = np.zeros(capacity, dtype=np.int8)
+        kind[:old] = self.kind
+        self.kind = kind
+        self.entities.extend([None] * (capacity - old))
+        self._free.extend(range(capacity - 1, old - 1, -1)) # Pop lowest rows first
+        self.capacity = capacity
+        # The arrays were reallocated: point every live entity at its new row
+        for row, entity in enumerate(self.entities):
+            if entity is not None:
+                self._bind(entity, row)
+
+    def _bind(self, entity, row):
+        entity._row = row
+        entity._pos = self.pos[row]
+        entity._prev_pos = self.prev[row]
+
+    def add(self, entity, velocity):
+        if not self._free:
+            self._grow(self.capacity * 2)
+        row = self._free.pop()
+        self.pos[row] = entity._pos
+        self.prev[row] = entity._prev_pos
+        self.vel[row] = velocity
+        self.size[row] = entity._size
+        self.kind[row] = KIND_CODES[entity.kind]
+        self.entities[row] = entity
+        self._bind(entity, row)
+        self.count += 1
+
+    def remove(self, entity):
+        row = entity._row
+        if row is None or self.entities[row] is not entity:
+            return
+        # Detach: the entity gets plain lists again so it stays usable once removed
+        entity._pos = [float(self.pos[row, 0]), float(self.pos[row, 1])]
+        entity._prev_pos = [float(self.prev[row, 0]), float(self.prev[row, 1])]
+        entity._row = None
+        self.entities[row] = None
+        self.kind[row] = 0
+        self.vel[row] = 0.0
+        self._free.append(row)
+        self.count -= 1
+
+    def clear(self):
+        for entity in self.entities:
+            if entity is not None:
+                self.remove(entity)
+
+    def step(self, dt, screen_height):
+        """Moves every row by one step and returns the entities that left the screen."""
+        self.prev[:] = self.pos
+        self.pos += self.vel * dt # Free rows have zero velocity
+        y = self.pos[:, 1]
+        # Only bullets leave through the top; enemies and power-ups may start above the screen (formations)
+        bullets = self.kind == KIND_CODES['bullets']
+        out = (self.kind != 0) & ((bullets & (y < -self.size[:, 1])) | (y > screen_height))
+        return [self.entities[row] for row in np.flatnonzero(out)]
+
+    def overlapping_rect(self, kind, rect):
+        """Returns (entities of `kind` overlapping `rect`, number of rows tested)."""
+        rows = np.flatnonzero(self.kind == KIND_CODES[kind])
+        if not len(rows):
+            return [], 0
+        lo = self.pos[rows]
+        hi = lo + self.size[rows]
+        hit = (lo[:, 0] < rect[0] + rect[2]) & (hi[:, 0] > rect[0]) & (lo[:, 1] < rect[1] + rect[3]) & (hi[:, 1] > rect[1])
+        return [self.entities[row] for row in rows[hit]], len(rows)
+
+    def overlapping_pairs(self, kind_a, kind_b):
+        """Vectorized AABB test of the `kind_a` rows against the `kind_b` rows.
+
+        A sort-and-sweep on x keeps this close to linear: the `kind_b` rows are
+        sorted by left edge once, each `kind_a` row gets the contiguous range
+        of rows that can overlap it on x, and only those candidate pairs get
+        the full AABB test. Returns (rows_a, rows_b, tested): parallel lists
+        of overlapping rows, ordered by row of a (look the entities up in
+        `self.entities`), and the number of candidate pairs tested.
+        """
+        rows_a = np.flatnonzero(self.kind == KIND_CODES[kind_a])
+        rows_b = np.flatnonzero(self.kind == KIND_CODES[kind_b])
+        if not len(rows_a) or not len(rows_b):
+            return [], [], 0
+        a_lo = self.pos[rows_a]
+        a_hi = a_lo + self.size[rows_a]
+        b_lo = self.pos[rows_b]
+        b_hi = b_lo + self.size[rows_b]
+        ia, ib, tested = self._sweep(a_lo, a_hi, b_lo, b_hi)
+        if not tested:
+            return [], [], 0
+        # b.left < a.right already holds for every candidate; test the other three edges
+        hit = b_hi[:, 0][ib] > a_lo[:, 0][ia]
+        hit &= b_lo[:, 1][ib] < a_hi[:, 1][ia]
+        hit &= b_hi[:, 1][ib] > a_lo[:, 1][ia]
+        return rows_a[ia[hit]].tolist(), rows_b[ib[hit]].tolist(), tested
+
+    def swept_pairs(self, kind_a, kind_b):
+        """Continuous version of overlapping_pairs over the last step().
+
+        The broadphase runs on the boxes swept from `prev` to `pos`, then each
+        candidate pair gets a vectorized slab test on the relative motion (see
+        spatial_grid.sweep_interval). Returns (rows_a, rows_b, tested) like
+        overlapping_pairs, ordered by row of a and then by time of impact, so
+        the first live b listed for a row is the one it reaches first.
+        """
+        rows_a = np.flatnonzero(self.kind == KIND_CODES[kind_a])
+        rows_b = np.flatnonzero(self.kind == KIND_CODES[kind_b])
+        if not len(rows_a) or not len(rows_b):
+            return [], [], 0
+        a_start = self.prev[rows_a]
+        a_delta = self.pos[rows_a] - a_start
+        a_size = self.size[rows_a]
+        b_start = self.prev[rows_b]
+        b_delta = self.pos[rows_b] - b_start
+        b_size = self.size[rows_b]
+        a_lo = np.minimum(a_start, self.pos[rows_a])
+        a_hi = a_lo + np.abs(a_delta) + a_size
+        b_lo = np.minimum(b_start, self.pos[rows_b])
+        b_hi = b_lo + np.abs(b_delta) + b_size
+        ia, ib, tested = self._sweep(a_lo, a_hi, b_lo, b_hi)
+        if not tested:
+            return [], [], 0
+        # Only pairs whose swept boxes also meet on y can collide during the step
+        near = (b_lo[:, 1][ib] < a_hi[:, 1][ia]) & (b_hi[:, 1][ib] > a_lo[:, 1][ia])
+        ia = ia[near]
+        ib = ib[near]
+
+        # Slab test per axis on the motion of a relative to b. Without relative
+        # motion the division gives -inf/+inf when the boxes overlap on that
+        # axis for the whole step, and same-signed infinities or NaN (merely
+        # touching) when they never do, which the comparisons below reject.
+        t_enter = 0.0
+        t_exit = 1.0
+        with np.errstate(divide='ignore', invalid='ignore'):
+            for axis in (0, 1):
+                a0 = a_start[:, axis][ia]
+                b0 = b_start[:, axis][ib]
+                d = a_delta[:, axis][ia] - b_delta[:, axis][ib]
+                t0 = (b0 - a0 - a_size[:, axis][ia]) / d # a's far edge reaches b's near edge
+                t1 = (b0 + b_size[:, axis][ib] - a0) / d # a's near edge leaves b's far edge
+                t_enter = np.maximum(t_enter, np.minimum(t0, t1))
+                t_exit = np.minimum(t_exit, np.maximum(t0, t1))
+        hit = np.flatnonzero(t_enter < t_exit)
+        if not len(hit):
+            return [], [], tested
+        order = hit[np.lexsort((t_enter[hit], ia[hit]))]
+        return rows_a[ia[order]].tolist(), rows_b[ib[order]].tolist(), tested
+
+    @staticmethod
+    def _sweep(a_lo, a_hi, b_lo, b_hi):
+        """Sort-and-sweep on x; returns candidate index arrays (ia, ib) and their count."""
+        # b overlaps a on x only if a.left - widest_b < b.left < a.right
+        order = np.argsort(b_lo[:, 0], kind='stable')
+        b_left = b_lo[order, 0]
+        widest_b = (b_hi[:, 0] - b_lo[:, 0]).max()
+        start = np.searchsorted(b_left, a_lo[:, 0] - widest_b, side='right')
+        end = np.searchsorted(b_left, a_hi[:, 0], side='left')
+        counts = np.maximum(end - start, 0)
+        tested = int(counts.sum())
+        if not tested:
+            return None, None, 0
+
+        # Expand the ranges into flat (i, j) candidate arrays
+        ia = np.repeat(np.arange(len(a_lo)), counts)
+        offsets = np.cumsum(counts) - counts
+        ib = order[start[ia] + np.arange(tested) - offsets[ia]]
+        return ia, ib, tested
@@ -0,0 +1,239 @@
+import os
+from collections import OrderedDict
+
+import pygame
+
+from utils import get_asset_path, load_asset_manifest
+from game_log import get_logger
+
+log = get_logger('assets')
+
+# Magenta placeholder used when an image is missing or fails to decode
+MISSING_IMAGE_COLOR = (255, 0, 255, 128)
+
+
+class ImageCache:
+    """Process-wide cache of decoded and scaled images, keyed by (source, size).
+
+    Decoded originals are kept for the lifetime of the process (there are only a
+    handful of PNGs), scaled variants are kept in an LRU so that odd sizes
+    (e.g. explosions sized after whatever died) cannot grow the cache forever.
+    Entities share the returned surfaces, so they must never be drawn on.
+    Collision masks are built on demand from the same variants and evicted
+    with them. decode() is the only part that may run off the main thread
+    (see preloader.py); everything else touches the display or the caches.
+    """
+    max_variants = 64 # Maximum number of scaled (source, size) variants kept
+
+    _originals = {} # source -> converted full-size surface (or None if missing)
+    _variants = OrderedDict() # (source, (w, h)) -> scaled surface
+    _pinned = set() # (source, (w, h)) keys that are never evicted (preloaded)
+    _masks = {} # (source, (w, h)) -> pygame.mask.Mask of the variant
+    _opaque = {} # (source, (w, h)) -> scaled surface without per-pixel alpha (backgrounds)
+
+    hits = 0
+    misses = 0
+    evictions = 0
+
+    @classmethod
+    def get(cls, source, size):
+        """Returns the surface for `source` scaled to `size`, loading it on first use."""
+        key = (source, (int(size[0]), int(size[1])))
+        surface = cls._variants.get(key)
+        if surface is not None:
+            cls.hits += 1
+            cls._variants.move_to_end(key)
+            return surface
+
+        cls.misses += 1
+        surface = cls._build(key[0], key[1])
+        cls._variants[key] = surface
+        cls._evict()
+        return surface
+
+    @classmethod
+    def get_mask(cls, source, size):
+        """Returns the collision mask of `source` at `size`, built once from the cached surface."""
+        key = (source, (int(size[0]), int(size[1])))
+        mask = cls._masks.get(key)
+        if mask is None:
+            mask = pygame.mask.from_surface(cls.get(*key))
+            cls._masks[key] = mask
+        return mask
+
+    @classmethod
+    def get_opaque(cls, source, size):
+        """Returns `source` scaled to `size` without per-pixel alpha, or None if it is missing.
+
+        For full-screen backgrounds: blitting them is a plain copy instead of an alpha blend.
+        """
+        key = (source, (int(size[0]), int(size[1])))
+        if key not in cls._opaque:
+            original = cls._load_original(source)
+            cls._opaque[key] = None if original is None else pygame.transform.scale(original.convert(), key[1])
+        return cls._opaque[key]
+
+    @classmethod
+    def preload(cls, entries):
+        """Loads and pins every (source, size) pair so gameplay never hits the disk."""
+        for source, size in entries:
+            key = (source, (int(size[0]), int(size[1])))
+            if key not in cls._variants:
+                cls._variants[key] = cls._build(key[0], key[1])
+            cls._pinned.add(key)
+
+    @classmethod
+    def clear(cls):
+        cls._originals.clear()
+        cls._variants.clear()
+        cls._pinned.clear()
+        cls._masks.clear()
+        cls._opaque.clear()
+        cls.hits = cls.misses = cls.evictions = 0
+
+    @classmethod
+    def stats(cls):
+        return {
+            'hits': cls.hits,
+            'misses': cls.misses,
+            'evictions': cls.evictions,
+            'originals': len(cls._originals),
+            'variants': len(cls._variants),
+            'pinned': len(cls._pinned),
+            'masks': len(cls._masks),
+        }
+
+    @classmethod
+    def _evict(cls):
+        # Drop least recently used variants, skipping the pinned (preloaded) ones
+        if len(cls._variants) <= cls.max_variants:
+            return
+        for key in list(cls._variants):
+            if len(cls._variants) <= cls.max_variants:
+                break
+            if key in cls._pinned:
+                continue
+            del cls._variants[key]
+            cls._masks.pop(key, None)
+            cls.evictions += 1
+
+    @staticmethod
+    def decode(source):
+        """Reads and decodes `source` without converting it, or returns None if it is missing.
+
+        Safe to call from worker threads: pygame releases the GIL while SDL decodes.
+        """
+        image_path = get_asset_path(source)
+        if not os.path.exists(image_path):
+            log.warning("Image file not found: %s. Using dummy surface.", image_path)
+            return None
+        try:
+            return pygame.image.load(image_path)
+        except pygame.error as e:
+            log.error("Error loading image %s: %s", source, e)
+            return None
+
+    @classmethod
+    def add_original(cls, source, image):
+        """Registers a decode() result (converted here, on the main thread) as the original of `source`."""
+        if source not in cls._originals:
+            cls._originals[source] = None if image is None else image.convert_alpha()
+        return cls._originals[source]
+
+    @classmethod
+    def _load_original(cls, source):
+        if source in cls._originals:
+            return cls._originals[source]
+        return cls.add_original(source, cls.decode(source))
+
+    @classmethod
+    def _build(cls, source, size):
+        original = cls._load_original(source)
+        if original is None:
+            surface = pygame.Surface(size, pygame.SRCALPHA) # Create a transparent dummy surface
+            pygame.draw.rect(surface, MISSING_IMAGE_COLOR, (0, 0, *size)) # Magenta transparent rect
+            return surface
+        if original.get_size() == size:
+            return original
+        return pygame.transform.scale(original, size) # Scale image to entity size
+
+
+class SpriteAtlas:
+    """All preloaded sprites packed into one surface, with a (source, size) -> Rect index.
+
+    Built once at startup from the ImageCache variants with a simple shelf
+    packer (tallest first, left to right, new shelf when a row is full).
+    Entities and the HUD blit sub-rects of the single atlas surface, which
+    keeps the pixel data together and lets GameWidget_Pygame draw every
+    entity with one Surface.blits() call. Sprites that are not in the
+    atlas (odd explosion sizes) keep using their own ImageCache surface.
+    """
+    padding = 1 # Transparent gap between sprites
+
+    surface = None
+    _rects = {} # (source, (w, h)) -> pygame.Rect inside `surface`
+
+    @classmethod
+    def build(cls, entries):
+        keys = []
+        for source, size in entries:
+            key = (source, (int(size[0]), int(size[1])))
+            if key not in keys:
+                keys.append(key)
+        if not keys:
+            return
+        placements, width, height = cls._pack([key[1] for key in keys])
+        surface = pygame.Surface((width, height), pygame.SRCALPHA).convert_alpha()
+        surface.fill((0, 0, 0, 0))
+        rects = {}
+        for key, rect in zip(keys, placements):
+            # Additive blit onto transparent pixels copies the sprite exactly, alpha included
+            surface.blit(ImageCache.get(*key), rect, special_flags=pygame.BLEND_RGBA_ADD)
+            rects[key] = rect
+        cls.surface = surface
+        cls._rects = rects
+
+    @classmethod
+    def lookup(cls, source, size):
+        """Returns the sprite's Rect in `surface`, or None if it was not packed."""
+        return cls._rects.get((source, (int(size[0]), int(size[1]))))
+
+    @classmethod
+    def clear(cls):
+        cls.surface = None
+        cls._rects = {}
+
+    @classmethod
+    def _pack(cls, sizes):
+        pad = cls.padding
+        # Aim for a roughly square atlas, never narrower than the widest sprite.
+        # Rows and sprites start on 16-byte boundaries: SDL's alpha blitter is
+        # about twice as slow reading from a surface with an odd pixel pitch.
+        area = sum((w + pad) * (h + pad) for w, h in sizes)
+        width = _align(max(max(w for w, _ in sizes) + pad, int(area ** 0.5) + 1), 16)
+        placements = [None] * len(sizes)
+        x = y = shelf_height = 0
+        for i in sorted(range(len(sizes)), key=lambda i: -sizes[i][1]):
+            w, h = sizes[i]
+            if x + w > width:
+                x, y = 0, y + shelf_height + pad
+                shelf_height = 0
+            placements[i] = pygame.Rect(x, y, w, h)
+            x = _align(x + w + pad, 4)
+            shelf_height = max(shelf_height, h)
+        return placements, width, y + shelf_height
+
+
+def _align(value, step):
+    return (value + step - 1) // step * step
+
+
+def manifest_images(manifest=None):
+    """(source, size) pairs used by the entities and the HUD, from assets/manifest.json."""
+    manifest = load_asset_manifest() if manifest is None else manifest
+    return [(entry['file'], tuple(entry['size'])) for entry in manifest.get('images', [])]
+
+def preload_game_images():
+    images = manifest_images()
+    ImageCache.preload(images)
+    SpriteAtlas.build(images)
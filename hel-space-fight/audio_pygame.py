@@ -0,0 +1,130 @@
+import os
+from collections import deque
+
+import pygame
+
+from utils import get_asset_path, load_asset_manifest
+from game_log import get_logger
+
+log = get_logger('audio')
+
+
+class SoundBank:
+    """Decodes each sound effect once and plays it through a reserved channel pool.
+
+    Every effect has a voice cap; when an effect is already playing on that many
+    channels its oldest voice is stolen instead of starting yet another one.
+    The shared volume is applied to the decoded sounds, so slider changes are
+    heard immediately, including on voices that are already playing.
+    """
+    num_channels = 16 # Channels reserved for sound effects (music uses its own stream)
+
+    _sounds = {} # name -> pygame.mixer.Sound (or None if missing)
+    _max_voices = {} # name -> voice cap
+    _voices = {} # name -> deque of channels currently playing it
+    _channels = [] # Reserved pygame.mixer.Channel objects
+    _owners = {} # channel -> name of the effect it was last given to
+    _volume = 1.0
+    played = 0 # Effects started since launch (read by metrics.py)
+
+    @classmethod
+    def init(cls, volume=1.0):
+        """Reserves the effect channels. Safe to call when the mixer is unavailable."""
+        cls._volume = volume
+        if not pygame.mixer.get_init() or cls._channels:
+            return
+        if pygame.mixer.get_num_channels() < cls.num_channels:
+            pygame.mixer.set_num_channels(cls.num_channels)
+        pygame.mixer.set_reserved(cls.num_channels)
+        cls._channels = [pygame.mixer.Channel(i) for i in range(cls.num_channels)]
+
+    @classmethod
+    def load(cls, name, filename, max_voices=4):
+        """Decodes `filename` once and registers it under `name`."""
+        if name in cls._sounds:
+            cls._max_voices[name] = max_voices
+            return cls._sounds[name]
+        return cls.add(name, cls.decode(filename), max_voices)
+
+    @classmethod
+    def add(cls, name, sound, max_voices=4):
+        """Registers an already decoded sound (a decode() result, possibly None) under `name`."""
+        cls._max_voices[name] = max_voices
+        cls._voices.setdefault(name, deque())
+        if sound is not None:
+            sound.set_volume(cls._volume)
+        cls._sounds[name] = sound
+        return sound
+
+    @staticmethod
+    def decode(filename):
+        """Reads and decodes a sound file; safe to call from worker threads. None if unavailable."""
+        sound_path = get_asset_path(filename)
+        if not pygame.mixer.get_init():
+            return None # No audio device (e.g. headless runs); effects are silently skipped
+        if not os.path.exists(sound_path):
+            log.warning("Sound not found: %s", sound_path)
+            return None
+        try:
+            return pygame.mixer.Sound(sound_path)
+        except pygame.error as e:
+            log.error("Could not load sound %s: %s", sound_path, e)
+            return None
+
+    @classmethod
+    def play(cls, name):
+        """Plays a loaded effect, stealing its oldest voice if it is at its cap."""
+        sound = cls._sounds.get(name)
+        if sound is None or not cls._channels:
+            return None
+
+        voices = deque(c for c in cls._voices[name] if c.get_busy()) # Forget voices that already finished
+        cls._voices[name] = voices
+        if len(voices) >= cls._max_voices[name]:
+            channel = voices.popleft() # Voice stealing: restart the oldest voice
+            channel.stop()
+        else:
+            channel = cls._free_channel()
+            if channel is None:
+                return None
+        previous = cls._owners.get(channel)
+        if previous != name and channel in cls._voices.get(previous, ()):
+            cls._voices[previous].remove(channel) # The channel now plays this effect, not the previous one
+        cls._owners[channel] = name
+        channel.play(sound)
+        cls.played += 1
+        voices.append(channel)
+        return channel
+
+    @classmethod
+    def set_volume(cls, volume):
+        """Applies the effects volume to every loaded sound, including playing voices."""
+        cls._volume = volume
+        for sound in cls._sounds.values():
+            if sound is not None:
+                sound.set_volume(volume)
+
+    @classmethod
+    def _free_channel(cls):
+        for channel in cls._channels:
+            if not channel.get_busy():
+                return channel
+        # Every reserved channel is busy: steal the one belonging to the busiest effect
+        busiest = max(cls._voices.values(), key=len, default=None)
+        if busiest:
+            channel = busiest.popleft()
+            channel.stop()
+            return channel
+        return None
+
+
+def manifest_sounds(manifest=None):
+    """(name, file, voice cap) of the sound effects used by the entities, from assets/manifest.json."""
+    manifest = load_asset_manifest() if manifest is None else manifest
+    return [(entry['name'], entry['file'], entry.get('max_voices', 4))
+            for entry in manifest.get('sounds', [])]
+
+def preload_game_sounds(volume=1.0):
+    SoundBank.init(volume)
+    for name, filename, max_voices in manifest_sounds():
+        SoundBank.load(name, filename, max_voices)
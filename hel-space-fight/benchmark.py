@@ -0,0 +1,220 @@
+"""Scenario benchmarks for the game update, collision and draw phases.
+
+Each scenario builds a seeded game on the headless drivers, then times
+GameWidget_Pygame.update (minus collisions), check_collisions and draw onto
+the off-screen display surface for a fixed number of frames:
+
+    python benchmark.py                              # run every scenario
+    python benchmark.py --scenario bullet_storm      # run one scenario
+    python benchmark.py --save-baseline bench.json   # record a baseline
+    python benchmark.py --baseline bench.json        # pass/fail against it
+"""
+import sys
+import json
+import time
+import argparse
+
+import pygame
+
+from headless_pygame import init_headless, create_game
+from entities_pygame import Enemy, FastEnemy, ArmoredEnemy
+
+DT = 1 / 60
+PHASES = ('update', 'collisions', 'draw')
+
+
+def _make_invulnerable(game):
+    # Scenarios measure the engine, not gameplay: the player must survive every frame
+    game.player.take_damage = lambda amount: None
+    game.keysPressed = {"spacebar"}
+
+
+def _top_up_enemies(game, count):
+    """Keeps `count` enemies alive, spread over the whole play field."""
+    enemy_types = (Enemy, FastEnemy, ArmoredEnemy)
+    missing = count - len(game.entities.group('enemies'))
+    for i in range(missing):
+        enemy_type = enemy_types[i % len(enemy_types)]
+        x = game.rng.randint(0, game.app.screen_width - 80)
+        y = game.rng.randint(-80, game.app.screen_height - 200)
+        game.add_entity(enemy_type((x, y), game_ref=game))
+
+
+class Scenario:
+    def __init__(self, name, description, setup, per_frame=None):
+        self.name = name
+        self.description = description
+        self.setup = setup
+        self.per_frame = per_frame
+
+
+def _setup_dense(game):
+    _make_invulnerable(game)
+    _top_up_enemies(game, 500)
+
+def _frame_dense(game, frame):
+    _top_up_enemies(game, 500)
+
+
+def _setup_bullet_storm(game):
+    _make_invulnerable(game)
+    game.player.activate_fire_rate_boost(10 ** 6)
+    _top_up_enemies(game, 20)
+
+def _frame_bullet_storm(game, frame):
+    # Extra volleys across the whole width on top of the boosted player fire
+    if frame % 3 == 0:
+        for x in range(0, game.app.screen_width, 40):
+            game.add_entity(game.bullet_pool.acquire((x, game.app.screen_height - 60), game_ref=game))
+    _top_up_enemies(game, 20)
+
+
+def _setup_explosions(game):
+    _make_invulnerable(game)
+    game.keysPressed = set()
+
+def _frame_explosions(game, frame):
+    # A fresh wave of 30 explosions every 5 frames, each living 0.5 s
+    if frame % 5 == 0:
+        for _ in range(30):
+            x = game.rng.randint(0, game.app.screen_width - 80)
+            y = game.rng.randint(0, game.app.screen_height - 80)
+            game.add_explosion((x, y), (80, 80))
+
+
+def _setup_swarm(game):
+    _make_invulnerable(game)
+    game.player.activate_fire_rate_boost(10 ** 6)
+    _top_up_enemies(game, 3000)
+
+def _frame_swarm(game, frame):
+    for x in range(0, game.app.screen_width, 40):
+        game.add_entity(game.bullet_pool.acquire((x, game.app.screen_height - 60), game_ref=game))
+    _top_up_enemies(game, 3000)
+
+
+SCENARIOS = {s.name: s for s in (
+    Scenario('dense_500_enemies', "500 enemies + continuous fire", _setup_dense, _frame_dense),
+    Scenario('swarm_3000_enemies', "3000 enemies + a 20-wide volley every frame", _setup_swarm, _frame_swarm),
+    Scenario('bullet_storm', "Boosted fire rate plus full-width volleys", _setup_bullet_storm, _frame_bullet_storm),
+    Scenario('explosion_wave', "30 explosions every 5 frames", _setup_explosions, _frame_explosions),
+)}
+
+
+def _percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def _summarize(samples):
+    ordered = sorted(samples)
+    return {
+        'mean_ms': 1000 * sum(ordered) / len(ordered),
+        'p95_ms': 1000 * _percentile(ordered, 0.95),
+        'p99_ms': 1000 * _percentile(ordered, 0.99),
+    }
+
+
+def run_scenario(scenario, screen, frames=600, warmup=60, seed=1234, use_array_store=False, draw=True):
+    """Runs one scenario and returns per-phase statistics."""
+    game = create_game(seed, screen.get_width(), screen.get_height(), use_array_store)
+    scenario.setup(game)
+    timings = {phase: [] for phase in PHASES}
+    entities_processed = 0
+    pairs_tested = 0
+
+    perf_counter = time.perf_counter
+    for frame in range(warmup + frames):
+        if scenario.per_frame:
+            scenario.per_frame(game, frame)
+        live = len(game.entities)
+
+        start = perf_counter()
+        game.update(DT)
+        updated = perf_counter()
+        if draw:
+            game.draw(screen)
+        drawn = perf_counter()
+
+        if frame < warmup:
+            continue
+        timings['update'].append(updated - start - game.collision_time)
+        timings['collisions'].append(game.collision_time)
+        timings['draw'].append(drawn - updated)
+        entities_processed += live
+        pairs_tested += game.collision_pairs_tested
+
+    simulated = sum(timings['update']) + sum(timings['collisions'])
+    result = {phase: _summarize(samples) for phase, samples in timings.items()}
+    result['frame'] = _summarize([sum(t) for t in zip(*timings.values())])
+    result['entities_per_second'] = entities_processed / simulated if simulated > 0 else 0.0
+    result['mean_entities'] = entities_processed / frames
+    result['mean_pairs_tested'] = pairs_tested / frames
+    return result
+
+
+def compare(results, baseline, tolerance):
+    """Returns a list of (scenario, metric, baseline, current) regressions."""
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        for phase in PHASES + ('frame',):
+            for metric in ('mean_ms', 'p95_ms'):
+                old = base[phase][metric]
+                new = result[phase][metric]
+                if old > 0 and new > old * (1 + tolerance):
+                    regressions.append((name, f"{phase}.{metric}", old, new))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the game update/collision/draw phases.")
+    parser.add_argument('--scenario', action='append', choices=sorted(SCENARIOS),
+                        help="Scenario to run (repeatable, default: all)")
+    parser.add_argument('--frames', type=int, default=600)
+    parser.add_argument('--warmup', type=int, default=60)
+    parser.add_argument('--seed', type=int, default=1234)
+    parser.add_argument('--baseline', help="Baseline JSON file to compare against")
+    parser.add_argument('--save-baseline', help="Write the results to this baseline JSON file")
+    parser.add_argument('--tolerance', type=float, default=0.15,
+                        help="Allowed slowdown against the baseline (0.15 = 15%%)")
+    parser.add_argument('--array-store', action='store_true', help="Use the NumPy array store for movers")
+    parser.add_argument('--no-draw', action='store_true', help="Skip the draw phase (simulation cost only)")
+    args = parser.parse_args(argv)
+
+    screen = init_headless()
+    results = {}
+    for name in args.scenario or SCENARIOS:
+        results[name] = run_scenario(SCENARIOS[name], screen, args.frames, args.warmup, args.seed,
+                                     args.array_store, not args.no_draw)
+        result = results[name]
+        print(f"{name}: {SCENARIOS[name].description}")
+        for phase in PHASES + ('frame',):
+            stats = result[phase]
+            print(f"  {phase:<10} mean {stats['mean_ms']:7.3f} ms   p95 {stats['p95_ms']:7.3f} ms   p99 {stats['p99_ms']:7.3f} ms")
+        print(f"  {result['entities_per_second']:,.0f} entities/s, {result['mean_entities']:.0f} live entities, "
+              f"{result['mean_pairs_tested']:.0f} pairs tested per frame")
+    pygame.quit()
+
+    if args.save_baseline:
+        with open(args.save_baseline, 'w') as f:
+            json.dump(results, f, indent=4)
+        print(f"Baseline written to {args.save_baseline}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        for name, metric, old, new in regressions:
+            print(f"FAIL {name} {metric}: {old:.3f} ms -> {new:.3f} ms")
+        if regressions:
+            return 1
+        print("PASS: no phase slower than the baseline tolerance")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
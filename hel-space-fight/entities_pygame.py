@@ -2,9 +2,17 @@
 
 import pygame
 import os
+import logging
 import sys
 import random
 
+from assets_pygame import ImageCache, SpriteAtlas
+from audio_pygame import SoundBank
+from animation_pygame import AnimationCache
+from game_log import get_logger
+
+log = get_logger('entities')
+
 # Get asset path function (copied from main_pygame.py to ensure consistency)
 def get_asset_path(filename):
     if hasattr(sys, '_MEIPASS'):
@@ -19,59 +27,66 @@ WHITE = (255, 255, 255)
 RED = (255, 0, 0)
 GREEN = (0, 255, 0)
 
-# Dummy class for pygame.time.Clock.schedule_once equivalent
-# since Kivy's Clock.schedule_once is used in original code
-class PygameClock:
-    _timer_events = []
-
-    @classmethod
-    def schedule_once(cls, callback, delay):
-        # This is a very basic simulation. In a real Pygame app,
-        # you'd manage timers using pygame.time.get_ticks()
-        # and checking elapsed time in the main loop.
-        # For now, it's a placeholder.
-        event = {'callback': callback, 'end_time': pygame.time.get_ticks() + delay * 1000, 'canceled': False}
-        cls._timer_events.append(event)
-        return event # Return the event dict so it can be canceled
-
-    @classmethod
-    def tick(cls):
-        current_time = pygame.time.get_ticks()
-        for event in list(cls._timer_events): # Iterate over a copy to allow modification during loop
-            if not event['canceled'] and current_time >= event['end_time']:
-                event['callback']()
-                cls._timer_events.remove(event)
-
-    @classmethod
-    def cancel(cls, event):
-        if event in cls._timer_events:
-            event['canceled'] = True # Mark as canceled, will be removed on next tick
+class EntityPool:
+    """Free list of reusable entities (bullets, explosions); acquire() calls reset() on a released instance."""
+    def __init__(self, entity_class, max_free=256):
+        self.entity_class = entity_class
+        self.max_free = max_free # Upper bound on idle instances kept around
+        self._free = []
+        self.created = 0
+        self.reused = 0
+        self.in_use = 0
+
+    def acquire(self, *args, **kwargs):
+        if self._free:
+            entity = self._free.pop()
+            entity.reset(*args, **kwargs)
+            self.reused += 1
+        else:
+            entity = self.entity_class(*args, **kwargs)
+            entity._pool = self
+            self.created += 1
+        self.in_use += 1
+        return entity
+
+    def release(self, entity):
+        self.in_use -= 1
+        if len(self._free) < self.max_free:
+            entity.game = None # Do not keep the game alive through idle instances
+            self._free.append(entity)
+
+    def stats(self):
+        return {'in_use': self.in_use, 'free': len(self._free), 'created': self.created, 'reused': self.reused}
 
 # Base Entity class
 class Entity:
+    # Slots keep per-instance memory small for the high-churn entities;
+    # subclasses without __slots__ (Enemy, Player...) still get a __dict__.
+    __slots__ = ('_pos', '_prev_pos', '_size', '_source', '_image', '_atlas_rect', '_row', '_pool', 'game')
+    kind = 'effects' # Registry group in GameWidget_Pygame (see game_core_pygame.ENTITY_KINDS)
+
     def __init__(self, pos=(0, 0), size=(50, 50), source="bullshit.png", game_ref=None):
         self._pos = list(pos) # Use list for mutable position
+        self._prev_pos = list(pos) # Position at the previous simulation step (for render interpolation)
         self._size = list(size) # Use list for mutable size
         self._source = source
         self._image = None
+        self._atlas_rect = None # Sub-rect of SpriteAtlas.surface, when the sprite was packed
+        self._row = None # Row in the game's ArrayEntityStore, when it owns this entity's position
+        self._pool = None # EntityPool this instance returns to when removed, if pooled
         self.game = game_ref # Reference to GameWidget_Pygame
         self.load_image() # Load image when source is set
 
-    def load_image(self):
-        try:
-            image_path = get_asset_path(self._source)
-            if os.path.exists(image_path):
-                self._image = pygame.image.load(image_path).convert_alpha()
-                self._image = pygame.transform.scale(self._image, self._size) # Scale image to entity size
-            else:
-                print(f"Image file not found: {image_path}. Using dummy surface.")
-                self._image = pygame.Surface(self._size, pygame.SRCALPHA) # Create a transparent dummy surface
-                pygame.draw.rect(self._image, (255, 0, 255, 128), (0, 0, *self._size)) # Magenta transparent rect
-        except pygame.error as e:
-            print(f"Error loading image {self._source}: {e}")
-            self._image = pygame.Surface(self._size, pygame.SRCALPHA)
-            pygame.draw.rect(self._image, (255, 0, 255, 128), (0, 0, *self._size))
+    def _reset_position(self, pos):
+        """Moves a recycled entity to `pos` without allocating new lists."""
+        self._pos[0] = self._prev_pos[0] = pos[0]
+        self._pos[1] = self._prev_pos[1] = pos[1]
 
+    def load_image(self):
+        # Surfaces are shared through the process-wide cache, so spawning an
+        # entity never touches the filesystem once the image has been loaded.
+        self._image = ImageCache.get(self._source, self._size)
+        self._atlas_rect = SpriteAtlas.lookup(self._source, self._size)
 
     @property
     def pos(self):
@@ -90,9 +105,9 @@ class Entity:
     def size(self, value):
         self._size[0] = value[0]
         self._size[1] = value[1]
-        # Rescale image if size changes
+        # Fetch the matching size variant if size changes
         if self._image and self._image.get_size() != tuple(self._size):
-            self._image = pygame.transform.scale(self._image, self._size)
+            self.load_image()
 
 
     @property
@@ -105,39 +120,45 @@ class Entity:
             self._source = value
             self.load_image() # Reload image when source changes
 
-    def draw(self, screen):
-        """Draws the entity's image on the screen."""
-        if self._image:
-            screen.blit(self._image, self.pos)
-        else:
-            # Fallback drawing if image failed to load
-            pygame.draw.rect(screen, (255, 0, 255), (*self.pos, *self.size))
+    def sprite(self, alpha=1.0):
+        """(surface, position, area) for screen.blits, interpolated by `alpha` between the last two steps."""
+        prev, cur = self._prev_pos, self._pos
+        pos = (prev[0] + (cur[0] - prev[0]) * alpha, prev[1] + (cur[1] - prev[1]) * alpha)
+        if self._atlas_rect is not None:
+            return SpriteAtlas.surface, pos, self._atlas_rect
+        return self._image, pos, None
+
+    def get_velocity(self):
+        """Velocity in px/s used by the vectorized array store (straight-line movers only)."""
+        return (0.0, 0.0)
 
     def get_rect(self):
         """Returns a pygame.Rect object for collision detection."""
         return pygame.Rect(self._pos[0], self._pos[1], self._size[0], self._size[1])
 
+    def get_mask(self):
+        """Collision mask of the current image, shared through ImageCache."""
+        return ImageCache.get_mask(self._source, self._size)
+
 class Bullet(Entity):
+    __slots__ = ('speed', 'damage')
+    kind = 'bullets'
+
     def __init__(self, pos, speed=600, game_ref=None): # Increased speed for Pygame version
         super().__init__(pos=pos, size=(24, 48), source="bullet.png", game_ref=game_ref) # Bullet has specific size
+        self.reset(pos, speed, game_ref)
+
+    def reset(self, pos, speed=600, game_ref=None):
+        """(Re)initialises the bullet; called directly by EntityPool for recycled bullets."""
+        self._reset_position(pos)
         self.speed = speed
         self.damage = 50 # <--- تم التعديل هنا: زيادة ضرر الرصاصة
         self.game = game_ref
         
-        self.bullet_sound = None
-        sound_path = get_asset_path("bullet.wav")
-        if os.path.exists(sound_path):
-            try:
-                self.bullet_sound = pygame.mixer.Sound(sound_path)
-                # Set volume based on app's sfx_volume, assuming game_ref has access to app
-                if self.game and hasattr(self.game, 'app') and hasattr(self.game.app, 'sfx_volume'):
-                    self.bullet_sound.set_volume(self.game.app.sfx_volume)
-                self.bullet_sound.play()
-            except pygame.error as e:
-                print(f"Could not load bullet sound {sound_path}: {e}")
-        else:
-            print(f"Bullet sound not found: {sound_path}")
+        SoundBank.play("bullet") # Decoded once by the sound bank, played on a pooled channel
 
+    def get_velocity(self):
+        return (0.0, -self.speed) # Straight up
 
     def update(self, dt):
         self._pos[1] -= self.speed * dt # تحريك الرصاصة للأعلى في Pygame (تقليل Y)
@@ -145,13 +166,19 @@ class Bullet(Entity):
             self.game.remove_entity(self)
 
 class Enemy(Entity):
+    kind = 'enemies'
+    default_size = (80, 80) # Also used by the wave director to place formations
+
     def __init__(self, pos, speed=100, health=50, points_value=10, game_ref=None): # <--- تم التعديل هنا: تقليل صحة العدو الأساسي
-        super().__init__(pos=pos, size=(80, 80), source="enemy.png", game_ref=game_ref)
+        super().__init__(pos=pos, size=self.default_size, source="enemy.png", game_ref=game_ref)
         self.speed = speed
         self.health = health
         self.points_value = points_value
         self.game = game_ref # Reference to the GameWidget_Pygame
 
+    def get_velocity(self):
+        return (0.0, self.speed) # Straight down
+
     def update(self, dt):
         self._pos[1] += self.speed * dt # تحريك العدو للأسفل في Pygame (زيادة Y)
         if self._pos[1] > self.game.app.screen_height: # إذا خرج العدو من أسفل الشاشة
@@ -159,14 +186,16 @@ class Enemy(Entity):
 
     def take_damage(self, amount):
         self.health -= amount
-        print(f"Enemy at {self.pos} took {amount} damage. Health: {self.health}")
+        if log.isEnabledFor(logging.DEBUG): # Hottest collision path: skip building self.pos when off
+            log.debug("Enemy at %s took %s damage. Health: %s", self.pos, amount, self.health)
         if self.health <= 0:
-            print(f"Enemy at {self.pos} health reached 0. Adding explosion and removing.")
             self.game.add_explosion(self.pos, self.size) # Add explosion effect
             self.game.remove_entity(self) # Remove self
             self.game.add_score(self.points_value) # Add score
 
 class Player(Entity):
+    kind = 'player'
+
     def __init__(self, pos, game_ref=None):
         super().__init__(pos=pos, size=(100, 100), source="player.png", game_ref=game_ref)
         self.health = 100
@@ -197,7 +226,7 @@ class Player(Entity):
         if self.player_hit_sound: # هذا الشرط سيمنع تشغيل الصوت لأنه None
             self.player_hit_sound.play()
         if self.health <= 0:
-            print("Player destroyed!")
+            log.info("Player destroyed!")
             self.game.end_game()
 
     def update(self, dt):
@@ -223,29 +252,30 @@ class Player(Entity):
             if self._shoot_timer >= self._current_shoot_interval:
                 x = self.pos[0] + self.size[0] / 2 - 12 # Adjust for bullet width
                 y = self.pos[1] # الرصاصة تبدأ من أعلى اللاعب (تم التعديل هنا)
-                self.game.add_entity(Bullet((x, y), game_ref=self.game))
+                self.game.add_entity(self.game.bullet_pool.acquire((x, y), game_ref=self.game))
                 self._shoot_timer = 0.0
                 # print("Bullet fired!") # No need to print every bullet
 
     def activate_fire_rate_boost(self, duration):
-        print("Activating fire rate boost for player.")
+        log.debug("Activating fire rate boost for player.")
         if self._fire_rate_timer_event:
-            PygameClock.cancel(self._fire_rate_timer_event) # Cancel existing timer
+            self.game.clock.cancel(self._fire_rate_timer_event) # Cancel existing timer
 
         self._fire_rate_boost_active = True
         self._current_shoot_interval = 0.1 # Faster fire rate
         self._shoot_timer = 0.0 # Reset timer to allow immediate shot
 
         # Schedule deactivation
-        self._fire_rate_timer_event = PygameClock.schedule_once(self.deactivate_fire_rate_boost, duration)
-        print("Fire rate boost activated.")
+        # Runs on the game's simulation clock, so the boost also pauses with the game
+        self._fire_rate_timer_event = self.game.clock.schedule_once(self.deactivate_fire_rate_boost, duration)
+        log.debug("Fire rate boost activated.")
 
     def deactivate_fire_rate_boost(self):
-        print("Deactivating fire rate boost for player.")
+        log.debug("Deactivating fire rate boost for player.")
         self._fire_rate_boost_active = False
         self._current_shoot_interval = self._initial_shoot_interval # Reset to initial fire rate
         self._fire_rate_timer_event = None # Clear the event reference
-        print("Fire rate boost deactivated.")
+        log.debug("Fire rate boost deactivated.")
 
 class FastEnemy(Enemy):
     def __init__(self, pos, game_ref=None):
@@ -264,10 +294,16 @@ class ArmoredEnemy(Enemy):
         self.source = "armored_enemy.png"
 
 class PowerUp(Entity):
+    kind = 'powerups'
+    default_size = (40, 40)
+
     def __init__(self, pos, game_ref=None):
-        super().__init__(pos=pos, size=(40, 40), source="powerup.png", game_ref=game_ref)
+        super().__init__(pos=pos, size=self.default_size, source="powerup.png", game_ref=game_ref)
         self.speed = 150
 
+    def get_velocity(self):
+        return (0.0, self.speed)
+
     def update(self, dt):
         self._pos[1] += self.speed * dt # تحريك تعزيز القوة للأسفل في Pygame (زيادة Y)
         if self._pos[1] > self.game.app.screen_height: # إذا خرج تعزيز القوة من أسفل الشاشة
@@ -275,7 +311,7 @@ class PowerUp(Entity):
 
     def activate(self, player):
         """Called when player collects the power-up."""
-        print("Generic PowerUp activated.")
+        log.debug("Generic PowerUp activated.")
         self.game.remove_entity(self) # Remove power-up after collection
 
 class FireRatePowerUp(PowerUp):
@@ -285,31 +321,36 @@ class FireRatePowerUp(PowerUp):
         self.duration = 10 # مدة التعزيز بالثواني
 
     def activate(self, player):
-        print("Fire Rate PowerUp activated!")
+        log.debug("Fire Rate PowerUp activated!")
         player.activate_fire_rate_boost(self.duration)
         self.game.remove_entity(self) # Remove power-up after collection
 
 class Explosion(Entity):
+    __slots__ = ('animation_duration', '_timer', '_frames', '_frame')
+
     def __init__(self, pos, size, game_ref=None):
         super().__init__(pos=pos, size=size, source="explosion.png", game_ref=game_ref)
+        self.reset(pos, size, game_ref)
+
+    def reset(self, pos, size, game_ref=None):
+        """(Re)initialises the explosion; called directly by EntityPool for recycled explosions."""
+        self._reset_position(pos)
+        self.size = size # Picks the cached image variant if the size changed
+        self.game = game_ref
         self.animation_duration = 0.5 # Duration for the explosion animation
         self._timer = 0.0
+        self._frames = AnimationCache.get(self._source, self._size) # Shared, pre-baked grow/fade frames
+        self._frame = 0
 
-        self.explosion_sound = None
-        sound_path = get_asset_path("explosion.wav")
-        if os.path.exists(sound_path):
-            try:
-                self.explosion_sound = pygame.mixer.Sound(sound_path)
-                if self.game and hasattr(self.game, 'app') and hasattr(self.game.app, 'sfx_volume'):
-                    self.explosion_sound.set_volume(self.game.app.sfx_volume)
-                self.explosion_sound.play()
-            except pygame.error as e:
-                print(f"Could not load explosion sound {sound_path}: {e}")
-        else:
-            print(f"Explosion sound not found: {sound_path}")
-
+        SoundBank.play("explosion")
 
     def update(self, dt):
         self._timer += dt
         if self._timer >= self.animation_duration:
             self.game.remove_entity(self) # Remove explosion after its duration
+            return
+        self._frame = int(self._timer / self.animation_duration * len(self._frames))
+
+    def sprite(self, alpha=1.0):
+        _, pos, _ = super().sprite(alpha)
+        return self._frames[self._frame], pos, None
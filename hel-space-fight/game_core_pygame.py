@@ -2,6 +2,8 @@ import pygame
 import os
 import sys
 import random
+import time
+import itertools
 
 # Pygame specific constants and initialization
 # (Assume pygame is already initialized in main_pygame.py)
@@ -20,29 +22,6 @@ class PygameWindow:
         cls.width = size[0]
         cls.height = size[1]
         
-# Dummy class for Kivy's Clock.schedule_once equivalent
-class PygameClock:
-    _timer_events = []
-
-    @classmethod
-    def schedule_once(cls, callback, delay):
-        event = {'callback': callback, 'end_time': pygame.time.get_ticks() + delay * 1000, 'canceled': False}
-        cls._timer_events.append(event)
-        return event
-
-    @classmethod
-    def tick(cls):
-        current_time = pygame.time.get_ticks()
-        for event in list(cls._timer_events):
-            if not event['canceled'] and current_time >= event['end_time']:
-                event['callback']()
-                cls._timer_events.remove(event)
-
-    @classmethod
-    def cancel(cls, event):
-        if event in cls._timer_events:
-            event['canceled'] = True
-
 # Get asset path function (copied from main_pygame.py for consistency)
 def get_asset_path(filename):
     if hasattr(sys, '_MEIPASS'):
@@ -53,7 +32,17 @@ def get_asset_path(filename):
     return path
 
 # Import entities after defining get_asset_path if they use it directly on import
-from entities_pygame import Bullet, Enemy, FastEnemy, ArmoredEnemy, PowerUp, FireRatePowerUp, Explosion, Player
+from assets_pygame import ImageCache
+from spatial_grid import UniformGrid, sweep_interval, sweep_masks
+from scheduler import TimerScheduler
+from waves import WaveDirector
+from game_log import get_logger
+from hud_pygame import GameHUD
+from array_store import ArrayEntityStore, ARRAY_KINDS, array_store_available
+from entities_pygame import EntityPool
+from entities_pygame import Bullet, Explosion, Player
+
+log = get_logger('game')
 
 # Define a simple App class structure for volume access, if not already in main_pygame.py
 class DummyPygameApp:
@@ -73,10 +62,95 @@ class DummyPygameApp:
         return cls._instance
 
 
+# Entity kinds in draw order (back to front)
+ENTITY_KINDS = ('powerups', 'enemies', 'bullets', 'player', 'effects')
+
+class EntityRegistry:
+    """Entities indexed by kind (insertion-ordered dicts as ordered sets): O(1) add/remove, stable draw order."""
+    def __init__(self):
+        self._groups = {kind: {} for kind in ENTITY_KINDS}
+
+    def add(self, entity):
+        self._groups[entity.kind][entity] = None
+
+    def remove(self, entity):
+        """Removes `entity`, returning False if it was not registered."""
+        group = self._groups[entity.kind]
+        if entity in group:
+            del group[entity]
+            return True
+        return False
+
+    def group(self, kind):
+        """Live view of the entities of one kind, in insertion order."""
+        return self._groups[kind].keys()
+
+    def counts(self):
+        return {kind: len(group) for kind, group in self._groups.items()}
+
+    def clear(self):
+        for group in self._groups.values():
+            group.clear()
+
+    def __contains__(self, entity):
+        return entity in self._groups[entity.kind]
+
+    def __iter__(self):
+        for group in self._groups.values():
+            yield from group
+
+    def __len__(self):
+        return sum(len(group) for group in self._groups.values())
+
+
+class EntityCommandBuffer:
+    """Entity adds/removals queued during update() and applied in issue order; repeated removals are dropped."""
+    def __init__(self):
+        self._commands = [] # (is_add, entity) in issue order
+        self._removing = set() # Entities with a removal queued
+
+    def add(self, entity):
+        self._commands.append((True, entity))
+
+    def remove(self, entity):
+        """Queues a removal; returns False if one was already queued."""
+        if entity in self._removing:
+            return False
+        self._removing.add(entity)
+        self._commands.append((False, entity))
+        return True
+
+    def pending_removal(self, entity):
+        return entity in self._removing
+
+    def drain(self):
+        """Returns the queued commands and empties the buffer."""
+        commands = self._commands
+        self._commands = []
+        self._removing.clear()
+        return commands
+
+    def __len__(self):
+        return len(self._commands)
+
+
 class GameWidget_Pygame:
-    def __init__(self, app_ref, game_music_sound_path=None):
+    def __init__(self, app_ref, game_music_sound_path=None, use_array_store=False, continuous_collisions=True,
+                 pixel_collisions=False, waves=None):
         self.app = app_ref # Reference to the main PygameApp instance
-        self.entities = []
+        self.entities = EntityRegistry()
+        # While update() runs, add_entity/remove_entity only queue their change here;
+        # the queue is applied after the entity updates, after collisions and after spawning
+        self.entity_commands = EntityCommandBuffer()
+        self._deferring = False
+
+        # Optional NumPy struct-of-arrays storage for bullets, enemies and power-ups
+        self.array_store = None
+        if use_array_store:
+            if array_store_available():
+                self.array_store = ArrayEntityStore()
+            else:
+                log.warning("NumPy is not installed; using per-entity updates instead of the array store.")
         self.score = 0
         self.player = None
         self.is_game_running = False
@@ -86,6 +160,17 @@ class GameWidget_Pygame:
         # Pygame specific: store keyboard state
         self.keysPressed = set()
 
+        # Simulation state: seeded RNG for spawning and elapsed game time in seconds
+        self.rng = random.Random()
+        self.seed = None # Seed of the current game, kept for replays
+        self.sim_time = 0.0
+        # Timers (power-up durations etc.) run on simulation time and stop while paused
+        self.clock = TimerScheduler()
+        # Fraction of a simulation step elapsed since the last update, set by the main loop
+        self.render_alpha = 1.0
+        # Optional replay.InputRecorder; records the seed and the keys of every step
+        self.recorder = None
+
         # Load music using pygame.mixer.music (for background music)
         self.game_music_sound_path = game_music_sound_path
         if self.game_music_sound_path and os.path.exists(self.game_music_sound_path):
@@ -94,123 +179,110 @@ class GameWidget_Pygame:
                 pygame.mixer.music.set_volume(self.app.music_volume)
                 # Music will be played in start_game
             except pygame.error as e:
-                print(f"Could not load background music {self.game_music_sound_path}: {e}")
+                log.warning("Could not load background music %s: %s", self.game_music_sound_path, e)
+        elif self.game_music_sound_path is None:
+            log.debug("No background music (headless run).")
         else:
-            print(f"Background music file not found: {self.game_music_sound_path}")
+            log.warning("Background music file not found: %s", self.game_music_sound_path)
 
         # Load heart image
         self.heart_image = None
         heart_path = get_asset_path("heart.png")
-        print(f"DEBUG Heart Load: Attempting to load heart from: {heart_path}")
+        log.debug("Heart Load: Attempting to load heart from: %s", heart_path)
         if os.path.exists(heart_path):
-            try:
-                self.heart_image = pygame.image.load(heart_path).convert_alpha()
-                self.heart_image = pygame.transform.scale(self.heart_image, (30, 30)) # Scale to desired size
-                print(f"DEBUG Heart Load: Successfully loaded heart image. Image object: {self.heart_image}")
-            except pygame.error as e:
-                print(f"DEBUG Heart Load: Error loading heart image {heart_path}: {e}")
+            self.heart_image = ImageCache.get("heart.png", (30, 30)) # Scaled once, shared via the image cache
+            log.debug("Heart Load: Successfully loaded heart image. Image object: %s", self.heart_image)
         else:
-            print(f"DEBUG Heart Load: Heart image file not found at: {heart_path}. Using red squares.")
+            log.warning("Heart Load: Heart image file not found at: %s. Using red squares.", heart_path)
 
 
-        # Timer for enemy spawning
-        self._enemy_spawn_timer = 0.0
-        self._enemy_spawn_interval = 2.0 # Spawn an enemy every 2 seconds
-
-    def update(self, dt):
-        if not self.is_game_running or self.is_paused: # Only update if game is running AND not paused
-            return
+        # Recycled high-churn entities (see EntityPool)
+        self.bullet_pool = EntityPool(Bullet)
+        self.explosion_pool = EntityPool(Explosion)
 
-        PygameClock.tick() # Process scheduled events for things like power-ups
+        # Cached HUD layers (score, hearts, game-over panel)
+        self.hud = GameHUD(self.app.screen_width, self.app.screen_height, self.heart_image)
 
-        # Update all entities
-        entities_to_remove = []
-        for entity in list(self.entities): # Iterate over a copy to allow modification
-            entity.update(dt)
-            # Collect entities that went off screen or marked for removal
-            if isinstance(entity, (Bullet, Enemy, PowerUp, Explosion)) and (
-                entity.pos[1] < -entity.size[1] or entity.pos[1] > self.app.screen_height + entity.size[1]
-            ):
-                # This needs to be handled by each entity's update method itself, calling remove_entity
-                # The entities' update methods already check for off-screen and call self.game.remove_entity(self)
-                pass # No need for a generic check here if entities remove themselves
+        # Broadphase grid used by check_collisions, rebuilt every frame.
+        # Cells are as large as the biggest enemy so a bullet touches at most 4 cells.
+        self._collision_grid = UniformGrid(cell_size=80)
+        self.collision_pairs_tested = 0 # Narrowphase pairs tested in the last check_collisions
+        self.collision_pairs_total = 0 # ... and in every check since the widget was built
+        self.collision_time = 0.0 # Seconds spent in the last check_collisions
+        # Test bullets against enemies over the whole step (swept boxes) instead of
+        # only where both ended up, so fast bullets cannot tunnel at low sim rates
+        self.continuous_collisions = continuous_collisions
+        # Confirm rect/broadphase hits with the sprites' cached masks, so
+        # transparent corners do not count
+        self.pixel_collisions = pixel_collisions
 
-        # Process removals (entities removed by their own update methods or collision checks)
-        # The actual removal from self.entities happens in self.remove_entity
+        # Enemy and power-up spawning, driven by assets/waves.json (or the `waves` definitions given)
+        self.wave_director = WaveDirector(self, waves)
+        self.spawned = 0 # Entities built by spawn_entity since the widget was built
 
-        # Check collisions
-        self.check_collisions()
+    def update(self, dt):
+        self.collision_time = 0.0
+        if not self.is_game_running or self.is_paused: # Only update if game is running AND not paused
+            return
 
-        # Spawn new enemies
-        self._enemy_spawn_timer += dt
-        if self._enemy_spawn_timer >= self._enemy_spawn_interval:
-            self.spawn_enemy()
-            self._enemy_spawn_timer = 0.0
+        if self.recorder is not None:
+            self.recorder.record(self.keysPressed, dt)
+        self.sim_time += dt
+        self.clock.advance(dt) # Fire timers that are due, e.g. power-up expiry
+
+        self._deferring = True
+        try:
+            store = self.array_store
+            if store is not None:
+                # Bullets, enemies and power-ups move and get culled in one vectorized step
+                for entity in store.step(dt, self.app.screen_height):
+                    self.remove_entity(entity)
+                entities = itertools.chain(self.entities.group('player'), self.entities.group('effects'))
+            else:
+                entities = self.entities # Changes are queued, so the registry can be iterated directly
+
+            # Update all entities
+            # The entities' update methods check for off-screen and call self.game.remove_entity(self)
+            for entity in entities:
+                prev, pos = entity._prev_pos, entity._pos
+                prev[0] = pos[0] # Remember where the step started, for render interpolation
+                prev[1] = pos[1]
+                entity.update(dt)
+            self.flush_entity_commands() # Culled entities must not take part in collisions
+
+            # Check collisions (timed separately so profilers can split it out of update)
+            collision_start = time.perf_counter()
+            self.check_collisions()
+            self.flush_entity_commands()
+            self.collision_time = time.perf_counter() - collision_start
+
+            # Spawn new enemies (at most the director's spawn budget per step)
+            self.wave_director.update(dt)
+            self.flush_entity_commands()
+        finally:
+            self._deferring = False
 
     def draw(self, screen):
+        """Draws the game and returns the rects it touched (for dirty-rect rendering)."""
         # Draw background (handled by screen.draw method)
-        # Draw all entities
-        for entity in self.entities:
-            entity.draw(screen)
-        
-        # Draw score (simplified for Pygame)
-        font = pygame.font.Font(None, 36) # Default font, size 36
-        score_text = font.render(f"Score: {self.score}", True, (255, 255, 255)) # White color
-        screen.blit(score_text, (10, self.app.screen_height - 40)) # Position at bottom left
-
-        # Draw player health (using heart image or red squares)
-        health_icon_size = 30
-        health_padding = 5
+        # Draw all entities, interpolated between the last two simulation steps
+        alpha = self.render_alpha if self.is_game_running and not self.is_paused else 1.0
+        # One blits() call for every entity; most sprites are sub-rects of the atlas surface
+        drawn_rects = screen.blits([entity.sprite(alpha) for entity in self.entities], doreturn=True)
         
-        # Determine number of "hearts" based on health (e.g., 10 health per heart)
-        num_hearts = self.player.health // 10
-        if num_hearts < 0: num_hearts = 0
-
-        for i in range(num_hearts):
-            # Use heart image if available, otherwise use red square
-            if self.heart_image:
-                screen.blit(self.heart_image, (self.app.screen_width - (i + 1) * (health_icon_size + health_padding), 10))
-            else:
-                pygame.draw.rect(screen, (255, 0, 0), (self.app.screen_width - (i + 1) * (health_icon_size + health_padding), 10, health_icon_size, health_icon_size)) # Top right
-
+        # Score, hearts and game-over panel are cached surfaces, re-rendered only on change
+        drawn_rects.extend(self.hud.draw(screen, self.score, self.player.health))
 
         # Draw game over screen if active
         if self.game_over_visible:
-            # Darken background
-            s = pygame.Surface((self.app.screen_width, self.app.screen_height), pygame.SRCALPHA)
-            s.fill((0, 0, 0, 128)) # Semi-transparent black
-            screen.blit(s, (0,0))
-
-            # Game Over text
-            font = pygame.font.Font(None, 60)
-            game_over_text = font.render("GAME OVER", True, (255, 0, 0))
-            text_rect = game_over_text.get_rect(center=(self.app.screen_width / 2, self.app.screen_height / 2 - 50))
-            screen.blit(game_over_text, text_rect)
-
-            # Score text
-            score_font = pygame.font.Font(None, 40)
-            score_text = score_font.render(f"Final Score: {self.score}", True, (255, 255, 255))
-            score_rect = score_text.get_rect(center=(self.app.screen_width / 2, self.app.screen_height / 2))
-            screen.blit(score_text, score_rect)
-            
             # CORRECTED: Access high_score directly from app
-            high_score_text = score_font.render(f"High Score: {self.app.high_score}", True, (255, 255, 255))
-            high_score_rect = high_score_text.get_rect(center=(self.app.screen_width / 2, self.app.screen_height / 2 + 50))
-            screen.blit(high_score_text, high_score_rect)
-
-
-            # Restart button (simplified) - Kivy buttons are complex in Pygame, just draw a rect and check clicks
-            button_width, button_height = 200, 80
-            restart_button_rect = pygame.Rect(self.app.screen_width / 2 - button_width / 2, self.app.screen_height / 2 + 100, button_width, button_height)
-            pygame.draw.rect(screen, (0, 128, 255), restart_button_rect) # Blue button
-            
-            button_font = pygame.font.Font(None, 36)
-            restart_text = button_font.render("Restart", True, (255, 255, 255))
-            restart_text_rect = restart_text.get_rect(center=restart_button_rect.center)
-            screen.blit(restart_text, restart_text_rect)
+            self.hud.draw_game_over(screen, self.score, self.app.high_score)
 
             # Store the button rect for click detection
-            self._restart_button_rect = restart_button_rect
+            self._restart_button_rect = self.hud.restart_button_rect
+            drawn_rects.append(screen.get_rect())
+
+        return drawn_rects
 
     def handle_event(self, event):
         if event.type == pygame.KEYDOWN:
@@ -236,13 +308,27 @@ class GameWidget_Pygame:
                 if self.game_over_visible and hasattr(self, '_restart_button_rect') and self._restart_button_rect.collidepoint(event.pos):
                     self.restart_game()
 
-    def start_game(self):
-        print("GameWidget: Starting game.")
+    def start_game(self, seed=None):
+        """Starts a new game. `seed` makes enemy spawning reproducible."""
+        if seed is None:
+            seed = random.getrandbits(63) # Pick one explicitly so the game can be replayed
+        log.info("GameWidget: Starting game (seed %s).", seed)
+        self.seed = seed
+        self.rng.seed(seed)
+        if self.recorder is not None:
+            self.recorder.begin(seed, (self.app.screen_width, self.app.screen_height), self.simulation_options())
+        self.sim_time = 0.0
+        self.clock.clear() # Drop timers left over from the previous game
+        self.wave_director.reset()
         self.is_game_running = True
         self.is_paused = False
         self.game_over_visible = False
         self.score = 0
-        self.entities = []
+        for entity in list(self.entities): # Return pooled entities from the previous game
+            self.remove_entity(entity)
+        self.entities.clear()
+        if self.array_store is not None:
+            self.array_store.clear()
         self.keysPressed.clear()
 
         # Initialize player
@@ -257,33 +343,36 @@ class GameWidget_Pygame:
                 pygame.mixer.music.play(-1) # Loop indefinitely
                 pygame.mixer.music.set_volume(self.app.music_volume) # Set initial volume
         
-        # Reset any game state if necessary
-        # e.g., self._enemy_spawn_timer = 0.0
 
     def pause_game(self):
         if self.is_game_running and not self.is_paused:
-            print("GameWidget: Pausing game.")
+            log.info("GameWidget: Pausing game.")
             self.is_paused = True
-            pygame.mixer.music.pause()
+            if pygame.mixer.get_init():
+                pygame.mixer.music.pause()
             # Unbind keyboard to prevent input during pause, if desired
             # (In Pygame, you'd usually handle this by checking self.is_paused in handle_event)
 
 
     def resume_game(self):
         if self.is_game_running and self.is_paused:
-            print("GameWidget: Resuming game.")
+            log.info("GameWidget: Resuming game.")
             self.is_paused = False
-            pygame.mixer.music.unpause()
+            if pygame.mixer.get_init():
+                pygame.mixer.music.unpause()
             # Rebind keyboard if it was unbound
 
     def end_game(self):
         if self.is_game_running:
-            print("GameWidget: Stopping game.")
+            log.info("GameWidget: Stopping game (score %s).", self.score)
             self.is_game_running = False
             self.is_paused = True # Game is effectively paused at end screen
             self.game_over_visible = True
+            if self.recorder is not None:
+                self.recorder.finish(self.score)
             
-            pygame.mixer.music.stop()
+            if pygame.mixer.get_init(): # No mixer in headless runs
+                pygame.mixer.music.stop()
 
             # CORRECTED: Access high_score directly from app
             if self.score > self.app.high_score:
@@ -295,75 +384,219 @@ class GameWidget_Pygame:
             # self.app.root.current = 'game_over' # Kivy specific
 
     def restart_game(self):
-        print("Restarting game.")
+        log.info("Restarting game.")
         # Reset game state and restart
         self.app.root.current = 'game' # Go back to game screen
         self.start_game() # Call start_game to re-initialize everything
 
     def add_entity(self, entity):
-        self.entities.append(entity)
+        if self._deferring:
+            self.entity_commands.add(entity)
+            return
+        self.entities.add(entity)
+        if self.array_store is not None and entity.kind in ARRAY_KINDS:
+            self.array_store.add(entity, entity.get_velocity())
 
     def remove_entity(self, entity):
-        if entity in self.entities:
-            self.entities.remove(entity)
+        if self._deferring:
+            self.entity_commands.remove(entity) # Asking twice (e.g. hit and off-screen) queues it once
+            return
+        if not self.entities.remove(entity):
+            return # Not registered (already removed)
+        if entity._row is not None:
+            self.array_store.remove(entity)
+        if entity._pool is not None:
+            entity._pool.release(entity) # Recycled by the next acquire()
+
+    def flush_entity_commands(self):
+        """Applies the adds and removals queued during update(), in the order they were made."""
+        deferring, self._deferring = self._deferring, False
+        for is_add, entity in self.entity_commands.drain():
+            if is_add:
+                self.add_entity(entity)
+            else:
+                self.remove_entity(entity)
+        self._deferring = deferring
+
+    def pending_removal(self, entity):
+        """True if `entity` has been removed this step but is still registered until the next flush."""
+        return self.entity_commands.pending_removal(entity)
+
+    def simulation_options(self):
+        """Constructor options that change the simulation's outcome (stored in replays)."""
+        return {'continuous_collisions': self.continuous_collisions, 'pixel_collisions': self.pixel_collisions}
+
+    def timer_queue_length(self):
+        """Number of pending scheduled events (power-up timers etc.)."""
+        return len(self.clock)
 
     def add_score(self, points):
         self.score += points
 
-    def spawn_enemy(self):
-        # Decide which type of enemy to spawn
-        enemy_type = random.choices([Enemy, FastEnemy, ArmoredEnemy], weights=[0.6, 0.3, 0.1], k=1)[0]
-        
-        # Random x position, ensuring enemy is within screen bounds
-        enemy_x = random.randint(0, self.app.screen_width - 80) # Assuming enemy width is 80
-        
-        # Start enemy slightly off-screen at the top
-        enemy_y = -80 # Assuming enemy height is 80
-        
-        self.add_entity(enemy_type((enemy_x, enemy_y), game_ref=self))
-
-        # Randomly spawn a power-up sometimes
-        if random.random() < 0.15: # 15% chance to spawn a power-up
-            powerup_x = random.randint(0, self.app.screen_width - 40) # Assuming powerup width is 40
-            powerup_y = -40 # Start power-up off-screen
-            self.add_entity(FireRatePowerUp((powerup_x, powerup_y), game_ref=self))
+    def spawn_entity(self, entity_class, pos, lag=0.0):
+        """Builds an enemy/power-up at `pos` and adds it; `lag` moves it along as if built `lag` seconds ago."""
+        entity = entity_class(pos, game_ref=self)
+        if lag:
+            vx, vy = entity.get_velocity()
+            entity._reset_position((pos[0] + vx * lag, pos[1] + vy * lag))
+        self.add_entity(entity)
+        self.spawned += 1
+        return entity
 
     def check_collisions(self):
-        player_rect = self.player.get_rect()
+        # Removals are queued while the groups are iterated; update() flushes them,
+        # direct calls (tests, tools) flush here
+        deferring, self._deferring = self._deferring, True
+        try:
+            player_rect = self.player.get_rect()
+
+            if self.array_store is not None:
+                bullets_to_remove, enemies_near_player, pairs_tested = self._array_store_candidates(player_rect)
+            else:
+                bullets_to_remove, enemies_near_player, pairs_tested = self._grid_candidates(player_rect)
+
+            for bullet in bullets_to_remove:
+                self.remove_entity(bullet)
+
+            # Check player-enemy collisions
+            for enemy in enemies_near_player:
+                if enemy.health > 0 and player_rect.colliderect(enemy.get_rect()) and self._pixels_touch(self.player, enemy):
+                    self.player.take_damage(20) # Player takes 20 damage on enemy collision
+                    self.add_explosion(enemy.pos, enemy.size) # Explosion on enemy
+                    self.remove_entity(enemy)
+            for powerup in self.entities.group('powerups'): # activate() only queues its removal
+                if self.pending_removal(powerup):
+                    continue
+                pairs_tested += 1
+                if player_rect.colliderect(powerup.get_rect()) and self._pixels_touch(self.player, powerup):
+                    powerup.activate(self.player) # Power-up affects player and removes itself
+
+            self.collision_pairs_tested = pairs_tested
+            self.collision_pairs_total += pairs_tested
+        finally:
+            self._deferring = deferring
+        if not deferring:
+            self.flush_entity_commands()
+
+    def _grid_candidates(self, player_rect):
+        """Resolves bullet hits through the uniform grid; returns (bullets that hit, enemies near the player, pairs tested)."""
+        # Broadphase: bucket the enemies once per frame, then every bullet only
+        # tests the enemies sharing its grid cells instead of all of them.
+        grid = self._collision_grid
+        grid.clear()
+        if self.continuous_collisions:
+            return self._grid_swept_candidates(grid, player_rect)
+        for enemy in self.entities.group('enemies'):
+            grid.insert(enemy, enemy.get_rect())
 
         # Check bullet-enemy collisions
         bullets_to_remove = []
-        for bullet in [e for e in self.entities if isinstance(e, Bullet)]:
+        for bullet in self.entities.group('bullets'):
             bullet_rect = bullet.get_rect()
-            for enemy in [e for e in self.entities if isinstance(e, Enemy)]:
-                enemy_rect = enemy.get_rect()
-                if bullet_rect.colliderect(enemy_rect):
+            for enemy, enemy_rect in grid.query(bullet_rect):
+                if enemy.health <= 0:
+                    continue # Already destroyed by another bullet this frame
+                if bullet_rect.colliderect(enemy_rect) and self._pixels_touch(bullet, enemy):
                     enemy.take_damage(bullet.damage)
                     bullets_to_remove.append(bullet)
                     # Enemy might be removed by take_damage, so we don't add to enemies_to_remove directly
                     break # Bullet hits only one enemy
 
-        for bullet in bullets_to_remove:
-            self.remove_entity(bullet)
+        enemies_near_player = [enemy for enemy, enemy_rect in grid.query(player_rect)]
+        return bullets_to_remove, enemies_near_player, grid.pairs_tested
 
-        # Check player-enemy collisions
-        enemies_to_remove_on_player_hit = []
-        powerups_to_collect = []
-        for entity in [e for e in self.entities if isinstance(e, (Enemy, PowerUp))]:
-            entity_rect = entity.get_rect()
-            if player_rect.colliderect(entity_rect):
-                if isinstance(entity, Enemy):
-                    self.player.take_damage(20) # Player takes 20 damage on enemy collision
-                    self.add_explosion(entity.pos, entity.size) # Explosion on enemy
-                    enemies_to_remove_on_player_hit.append(entity)
-                elif isinstance(entity, PowerUp):
-                    entity.activate(self.player) # Power-up affects player
-                    powerups_to_collect.append(entity) # Power-up removes itself in activate method
+    def _grid_swept_candidates(self, grid, player_rect):
+        """Continuous version of _grid_candidates: swept boxes in the grid, earliest time of impact wins."""
+        grid.insert_moving(self.entities.group('enemies')) # Each entry carries the enemy's step motion
 
-        for enemy in enemies_to_remove_on_player_hit:
-            self.remove_entity(enemy)
-        for powerup in powerups_to_collect:
-            self.remove_entity(powerup) # Powerup.activate already calls remove_entity(self) for itself
+        bullets_to_remove = []
+        for bullet in self.entities.group('bullets'):
+            prev, pos, size = bullet._prev_pos, bullet._pos, bullet._size
+            x, y, new_x, new_y = prev[0], prev[1], pos[0], pos[1]
+            bullet_start, bullet_delta = (x, y, size[0], size[1]), (new_x - x, new_y - y)
+            left, top = min(x, new_x), min(y, new_y)
+            swept = (left, top, max(x, new_x) - left + size[0], max(y, new_y) - top + size[1])
+            first_hit = None
+            first_time = 2.0
+            contacts = [] # (interval, enemy), only collected for pixel collisions
+            for enemy, (enemy_start, enemy_delta) in grid.query(swept):
+                if enemy.health <= 0:
+                    continue # Already destroyed by another bullet this frame
+                interval = sweep_interval(bullet_start, bullet_delta, enemy_start, enemy_delta)
+                if interval is None:
+                    continue
+                if self.pixel_collisions:
+                    contacts.append((interval, enemy))
+                elif interval[0] < first_time:
+                    first_hit = enemy
+                    first_time = interval[0]
+            if contacts:
+                contacts.sort(key=lambda contact: contact[0][0])
+                for interval, enemy in contacts:
+                    if self._pixels_touch_swept(bullet, enemy, interval):
+                        first_hit = enemy
+                        break
+            if first_hit is not None:
+                first_hit.take_damage(bullet.damage) # Bullet hits only the enemy it reached first
+                bullets_to_remove.append(bullet)
+
+        enemies_near_player = [enemy for enemy, motion in grid.query(player_rect)]
+        return bullets_to_remove, enemies_near_player, grid.pairs_tested
+
+    def _array_store_candidates(self, player_rect):
+        """Same as _grid_candidates, with the overlap tests vectorized by the array store."""
+        store = self.array_store
+        if self.continuous_collisions:
+            # Ordered by bullet row, then time of impact: the first live enemy is the one hit
+            bullet_rows, enemy_rows, pairs_tested = store.swept_pairs('bullets', 'enemies')
+        else:
+            bullet_rows, enemy_rows, pairs_tested = store.overlapping_pairs('bullets', 'enemies')
+        bullets_to_remove = []
+        rows = store.entities
+        last_hit_row = None
+        for bullet_row, enemy_row in zip(bullet_rows, enemy_rows): # Ordered by bullet row
+            if bullet_row == last_hit_row:
+                continue # Bullet hits only one enemy
+            enemy = rows[enemy_row]
+            if enemy is None or enemy.health <= 0:
+                continue # Already destroyed by another bullet this frame
+            bullet = rows[bullet_row]
+            if self.pixel_collisions:
+                touching = self._pixels_touch_swept if self.continuous_collisions else self._pixels_touch
+                if not touching(bullet, enemy):
+                    continue # Boxes meet but the sprites do not; try the next enemy
+            enemy.take_damage(bullet.damage)
+            bullets_to_remove.append(bullet)
+            last_hit_row = bullet_row
+
+        enemies_near_player, tested = store.overlapping_rect('enemies', player_rect)
+        return bullets_to_remove, enemies_near_player, pairs_tested + tested
+
+    def _pixels_touch(self, a, b):
+        """Mask test at the current positions, for pairs whose rects already overlap."""
+        if not self.pixel_collisions:
+            return True
+        offset = (int(b._pos[0]) - int(a._pos[0]), int(b._pos[1]) - int(a._pos[1]))
+        return a.get_mask().overlap(b.get_mask(), offset) is not None
+
+    def _pixels_touch_swept(self, a, b, interval=None):
+        """Mask test over the last step, for pairs whose swept boxes already meet."""
+        a_start, a_delta = _step_motion(a)
+        b_start, b_delta = _step_motion(b)
+        if interval is None:
+            interval = sweep_interval(a_start, a_delta, b_start, b_delta)
+            if interval is None:
+                return False
+        return sweep_masks(a.get_mask(), a_start, a_delta, b.get_mask(), b_start, b_delta, interval) is not None
 
     def add_explosion(self, pos, size):
-        self.add_entity(Explosion(pos, size, game_ref=self))
+        self.add_entity(self.explosion_pool.acquire(pos, size, game_ref=self))
+
+    def pool_stats(self):
+        return {'bullets': self.bullet_pool.stats(), 'explosions': self.explosion_pool.stats()}
+
+
+def _step_motion(entity):
+    """(x, y, w, h) at the start of the last step and the (dx, dy) moved during it."""
+    prev, pos, size = entity._prev_pos, entity._pos, entity._size
+    return (prev[0], prev[1], size[0], size[1]), (pos[0] - prev[0], pos[1] - prev[1])
@@ -0,0 +1,114 @@
+"""Logging for the game: one stdlib logger per subsystem and an in-memory ring buffer.
+
+    from game_log import get_logger
+    log = get_logger('entities')
+    log.debug("Enemy at %s took %s damage", pos, amount) # Formatted only if it is recorded
+
+Arguments are passed separately instead of pre-formatted, so a disabled
+call is one cached level check; hot-path messages (hits, power-ups, screen
+changes) are DEBUG and off by default. main_pygame.py calls configure()
+with the --log-level / --log SUBSYSTEM=LEVEL options. Everything recorded
+is also kept in a bounded ring buffer, formatted only when dumped (F4 in
+the game). Without configure() (headless runs, tools) only warnings and
+errors reach stderr.
+"""
+import sys
+import logging
+from collections import deque
+
+ROOT = 'hsf'
+SUBSYSTEMS = ('app', 'screens', 'game', 'entities', 'waves', 'assets', 'audio', 'persistence', 'replay', 'metrics')
+LEVELS = ('debug', 'info', 'warning', 'error', 'critical')
+
+CONSOLE_FORMAT = '%(levelname)s %(name)s: %(message)s'
+DUMP_FORMAT = '%(relativeCreated)10.0f ms %(levelname)-8s %(name)s: %(message)s'
+
+
+def get_logger(subsystem):
+    return logging.getLogger(f'{ROOT}.{subsystem}')
+
+
+class RingBufferHandler(logging.Handler):
+    """Keeps the last `capacity` records; they are only formatted when dumped."""
+    def __init__(self, capacity=2000):
+        super().__init__(logging.NOTSET)
+        self.records = deque(maxlen=capacity) # Appends are thread-safe; old records fall off
+        self.setFormatter(logging.Formatter(DUMP_FORMAT))
+
+    def emit(self, record):
+        self.records.append(record)
+
+    def dump(self, stream=None):
+        """Writes the buffered records, oldest first, and returns how many were written."""
+        stream = stream or sys.stderr
+        records = list(self.records)
+        for record in records:
+            stream.write(self.format(record) + '\n')
+        stream.flush()
+        return len(records)
+
+    def clear(self):
+        self.records.clear()
+
+
+_console = None
+_ring = None
+
+
+def configure(level='info', levels=None, ring_capacity=2000, stream=None):
+    """Sets the default and per-subsystem levels and installs the console and ring-buffer handlers.
+
+    `levels` maps subsystem names to level names. Safe to call again; the
+    previous handlers are replaced.
+    """
+    global _console, _ring
+    root = logging.getLogger(ROOT)
+    root.setLevel(_level(level))
+    root.propagate = False
+    for subsystem in SUBSYSTEMS:
+        get_logger(subsystem).setLevel(logging.NOTSET) # Inherit unless overridden below
+    for subsystem, subsystem_level in (levels or {}).items():
+        get_logger(subsystem).setLevel(_level(subsystem_level))
+
+    for handler in (_console, _ring):
+        if handler is not None:
+            root.removeHandler(handler)
+    _console = logging.StreamHandler(stream or sys.stderr)
+    _console.setFormatter(logging.Formatter(CONSOLE_FORMAT))
+    _ring = RingBufferHandler(ring_capacity)
+    root.addHandler(_console)
+    root.addHandler(_ring)
+    return _ring
+
+
+def ring_buffer():
+    """The RingBufferHandler installed by configure(), or None."""
+    return _ring
+
+
+def dump_ring_buffer(path=None):
+    """Writes the ring buffer to `path` (stderr if None); returns the number of records written."""
+    if _ring is None:
+        return 0
+    if path is None:
+        return _ring.dump()
+    with open(path, 'w') as f:
+        return _ring.dump(f)
+
+
+def parse_levels(specs):
+    """Turns ["entities=debug", ...] (the --log option) into {subsystem: level}; raises ValueError."""
+    levels = {}
+    for spec in specs or ():
+        subsystem, sep, level = spec.partition('=')
+        if not sep or subsystem not in SUBSYSTEMS:
+            raise ValueError(f"expected SUBSYSTEM=LEVEL with SUBSYSTEM one of {', '.join(SUBSYSTEMS)}: {spec!r}")
+        _level(level)
+        levels[subsystem] = level
+    return levels
+
+
+def _level(name):
+    if str(name).lower() not in LEVELS:
+        raise ValueError(f"unknown log level {name!r} (expected one of {', '.join(LEVELS)})")
+    return getattr(logging, str(name).upper())
@@ -0,0 +1,129 @@
+"""Headless, fixed-step driver for GameWidget_Pygame.
+
+Runs the simulation with SDL's dummy video/audio drivers and a fixed dt, as
+fast as the CPU allows, for soak tests and profiling:
+
+    python headless_pygame.py --seed 42 --frames 36000
+"""
+import os
+import sys
+import json
+import time
+import argparse
+
+# Must be set before pygame initialises its video/audio subsystems
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+import pygame
+
+from assets_pygame import preload_game_images
+from animation_pygame import preload_game_animations
+from audio_pygame import preload_game_sounds
+from game_core_pygame import GameWidget_Pygame, DummyPygameApp
+
+
+class HeadlessApp(DummyPygameApp):
+    """Stand-in for PygameApp: no window, no screen manager, no saving."""
+    def __init__(self, screen_width=800, screen_height=600):
+        super().__init__(screen_width, screen_height)
+        self.high_score = 0
+
+    def save_game_data(self):
+        pass # Never touch the player's save file from a simulation
+
+
+def autopilot(game, frame):
+    """Default input: keep firing and track the lowest enemy on screen."""
+    keys = {"spacebar"}
+    target = None
+    for enemy in game.entities.group('enemies'):
+        if target is None or enemy.pos[1] > target.pos[1]:
+            target = enemy
+    if target is not None:
+        player_center = game.player.pos[0] + game.player.size[0] / 2
+        target_center = target.pos[0] + target.size[0] / 2
+        if target_center < player_center - 10:
+            keys.add("left")
+        elif target_center > player_center + 10:
+            keys.add("right")
+    return keys
+
+
+def init_headless(screen_width=800, screen_height=600):
+    """Initialises pygame on the dummy drivers and returns the off-screen display surface."""
+    pygame.display.init()
+    pygame.font.init()
+    screen = pygame.display.set_mode((screen_width, screen_height))
+    preload_game_images()
+    preload_game_animations()
+    preload_game_sounds() # Mixer is not initialised, so effects are silently skipped
+    return screen
+
+
+def create_game(seed=0, screen_width=800, screen_height=600, use_array_store=False, continuous_collisions=True,
+                pixel_collisions=False):
+    """Builds a started GameWidget_Pygame."""
+    app = HeadlessApp(screen_width, screen_height)
+    game = GameWidget_Pygame(app, use_array_store=use_array_store, continuous_collisions=continuous_collisions,
+                             pixel_collisions=pixel_collisions)
+    game.start_game(seed=seed)
+    return game
+
+
+def run_headless(seed=0, frames=3600, dt=1 / 60, input_fn=autopilot, draw=False, use_array_store=False,
+                 continuous_collisions=True, pixel_collisions=False):
+    """Runs `frames` fixed steps of `dt` seconds and returns the final state.
+
+    `input_fn(game, frame)` returns the set of pressed keys for each step.
+    The run stops early when the player dies. With `draw=True` every frame
+    is also rendered to the off-screen display surface.
+    """
+    screen = init_headless()
+    game = create_game(seed, use_array_store=use_array_store, continuous_collisions=continuous_collisions,
+                       pixel_collisions=pixel_collisions)
+
+    frame = 0
+    started = time.perf_counter()
+    while frame < frames and game.is_game_running:
+        game.keysPressed = set(input_fn(game, frame)) if input_fn else set()
+        game.update(dt)
+        if draw:
+            game.draw(screen)
+        frame += 1
+    elapsed = time.perf_counter() - started
+
+    return {
+        'seed': seed,
+        'frames': frame,
+        'dt': dt,
+        'sim_time': game.sim_time,
+        'score': game.score,
+        'player_health': game.player.health,
+        'game_over': not game.is_game_running,
+        'entities': game.entities.counts(),
+        'wall_time': elapsed,
+        'frames_per_second': frame / elapsed if elapsed > 0 else 0.0,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the game simulation without a window.")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--frames', type=int, default=3600)
+    parser.add_argument('--dt', type=float, default=1 / 60)
+    parser.add_argument('--draw', action='store_true', help="Also render every frame off-screen")
+    parser.add_argument('--idle', action='store_true', help="No input instead of the autopilot")
+    parser.add_argument('--array-store', action='store_true', help="Use the NumPy array store for movers")
+    parser.add_argument('--discrete-collisions', action='store_true', help="End-of-step bullet tests only")
+    parser.add_argument('--pixel-collisions', action='store_true', help="Confirm hits with sprite masks")
+    args = parser.parse_args(argv)
+
+    result = run_headless(args.seed, args.frames, args.dt, None if args.idle else autopilot, args.draw,
+                          args.array_store, not args.discrete_collisions, args.pixel_collisions)
+    print(json.dumps(result, indent=4))
+    pygame.quit()
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,127 @@
+import pygame
+
+from assets_pygame import SpriteAtlas
+
+
+class FontCache:
+    """Shares pygame fonts by size instead of building a new Font per draw call."""
+    _fonts = {}
+
+    @classmethod
+    def get(cls, size):
+        font = cls._fonts.get(size)
+        if font is None:
+            font = pygame.font.Font(None, size) # Default font
+            cls._fonts[size] = font
+        return font
+
+
+class OverlayCache:
+    """Pre-built full-screen (or any size) translucent fill surfaces."""
+    _overlays = {}
+
+    @classmethod
+    def get(cls, size, color=(0, 0, 0, 128)):
+        key = (tuple(size), tuple(color))
+        overlay = cls._overlays.get(key)
+        if overlay is None:
+            overlay = pygame.Surface(key[0], pygame.SRCALPHA)
+            overlay.fill(color)
+            cls._overlays[key] = overlay
+        return overlay
+
+
+class CachedText:
+    """A text label that is only re-rendered when its string changes."""
+    def __init__(self, size, color=(255, 255, 255)):
+        self.font = FontCache.get(size)
+        self.color = color
+        self.text = None
+        self.surface = None
+
+    def render(self, text):
+        if text != self.text:
+            self.text = text
+            self.surface = self.font.render(text, True, self.color)
+        return self.surface
+
+
+class GameHUD:
+    """Score, health and game-over layers for GameWidget_Pygame.
+
+    Every layer is rendered into a surface once and re-rendered only when the
+    value it shows changes, so a normal frame is just a few blits.
+    """
+    health_icon_size = 30
+    health_padding = 5
+
+    def __init__(self, screen_width, screen_height, heart_image=None):
+        self.screen_width = screen_width
+        self.screen_height = screen_height
+        self.heart_image = heart_image
+
+        self.score_text = CachedText(36)
+        self._hearts = None # Surface holding the row of hearts
+        self._hearts_count = None
+        self._game_over = None # Pre-composed game-over panel (overlay + texts + button)
+        self._game_over_key = None
+
+        button_width, button_height = 200, 80
+        self.restart_button_rect = pygame.Rect(screen_width / 2 - button_width / 2, screen_height / 2 + 100, button_width, button_height)
+
+    def draw(self, screen, score, health):
+        """Draws score and hearts, returning the rects touched."""
+        score_surface = self.score_text.render(f"Score: {score}")
+        rects = [screen.blit(score_surface, (10, self.screen_height - 40))] # Position at bottom left
+
+        # Determine number of "hearts" based on health (e.g., 10 health per heart)
+        num_hearts = max(0, health // 10)
+        if num_hearts != self._hearts_count:
+            self._hearts = self._render_hearts(num_hearts)
+            self._hearts_count = num_hearts
+        if self._hearts is not None:
+            rects.append(screen.blit(self._hearts, (self.screen_width - self._hearts.get_width(), 10))) # Top right
+        return rects
+
+    def draw_game_over(self, screen, score, high_score):
+        key = (score, high_score)
+        if key != self._game_over_key:
+            self._game_over = self._render_game_over(score, high_score)
+            self._game_over_key = key
+        screen.blit(self._game_over, (0, 0))
+
+    def _render_hearts(self, num_hearts):
+        if num_hearts == 0:
+            return None
+        step = self.health_icon_size + self.health_padding
+        hearts = pygame.Surface((num_hearts * step, self.health_icon_size), pygame.SRCALPHA)
+        heart_rect = SpriteAtlas.lookup("heart.png", (self.health_icon_size, self.health_icon_size))
+        for i in range(num_hearts):
+            # Hearts are laid out right to left, like the original per-frame loop
+            x = hearts.get_width() - (i + 1) * step
+            # Use heart image if available, otherwise use red square
+            if heart_rect is not None:
+                hearts.blit(SpriteAtlas.surface, (x, 0), heart_rect)
+            elif self.heart_image:
+                hearts.blit(self.heart_image, (x, 0))
+            else:
+                pygame.draw.rect(hearts, (255, 0, 0), (x, 0, self.health_icon_size, self.health_icon_size))
+        return hearts
+
+    def _render_game_over(self, score, high_score):
+        width, height = self.screen_width, self.screen_height
+        panel = OverlayCache.get((width, height)).copy() # Semi-transparent black
+
+        game_over_text = FontCache.get(60).render("GAME OVER", True, (255, 0, 0))
+        panel.blit(game_over_text, game_over_text.get_rect(center=(width / 2, height / 2 - 50)))
+
+        score_font = FontCache.get(40)
+        score_text = score_font.render(f"Final Score: {score}", True, (255, 255, 255))
+        panel.blit(score_text, score_text.get_rect(center=(width / 2, height / 2)))
+        high_score_text = score_font.render(f"High Score: {high_score}", True, (255, 255, 255))
+        panel.blit(high_score_text, high_score_text.get_rect(center=(width / 2, height / 2 + 50)))
+
+        pygame.draw.rect(panel, (0, 128, 255), self.restart_button_rect) # Blue button
+        restart_text = FontCache.get(36).render("Restart", True, (255, 255, 255))
+        panel.blit(restart_text, restart_text.get_rect(center=self.restart_button_rect.center))
+        return panel
@@ -1,11 +1,21 @@
-import pygame
 import os
 import sys
 import json
+import argparse
+import time
+
+from startup_trace import StartupTrace
+
+# --startup-trace is checked before argparse runs so the imports below are timed too
+startup = StartupTrace(enabled='--startup-trace' in sys.argv[1:])
+
+with startup.step("import pygame"):
+    import pygame
 
 # Setup Pygame
-pygame.init()
-pygame.mixer.init() # Ensure mixer is initialized early
+with startup.step("pygame.init"):
+    pygame.init()
+    pygame.mixer.init() # Ensure mixer is initialized early
 
 # Dummy class for Kivy's Config
 class PygameConfig:
@@ -37,39 +47,104 @@ Config.set('graphics', 'height', '600')
 # Config.set('graphics', 'backend', 'sdl2')
 
 # تم التعديل: استيراد get_asset_path من utils
-from utils import get_asset_path
+with startup.step("import game modules"):
+    from utils import get_asset_path, get_user_data_path
+    from preloader import AssetPreloader
+    from profiler_pygame import FrameProfiler, PhaseTimer
+    from render_pygame import DirtyRectRenderer
+    from replay import InputRecorder
+    from persistence import PersistenceWriter
+    from metrics import MetricsExporter, MetricsSink
+    from game_log import (get_logger, configure as configure_logging, parse_levels, dump_ring_buffer,
+                          LEVELS as LOG_LEVELS, SUBSYSTEMS as LOG_SUBSYSTEMS)
 
 # Import Pygame-specific screens and game core
-from screens_pygame import PygameScreenManager, MainMenuScreen_Pygame, SettingsScreen_Pygame, GameScreen_Pygame, PauseScreen_Pygame
+with startup.step("import screens"):
+    from screens_pygame import PygameScreenManager
 # from game_core_pygame import GameWidget_Pygame # GameWidget is imported by PygameScreenManager internally
 
+log = get_logger('app')
+
 class PygameApp:
-    def __init__(self):
+    def __init__(self, dirty_rects=False, dirty_threshold=0.35, sim_rate=60, max_fps=60, use_array_store=False,
+                 record_path=None, continuous_collisions=True, pixel_collisions=False, metrics_path=None,
+                 metrics_socket=None, metrics_interval=5.0):
+        self.startup = startup # Read by PygameScreenManager to time screens built on first use
+
         # Set up display
-        self.screen_width = int(Config.get('graphics', 'width'))
-        self.screen_height = int(Config.get('graphics', 'height'))
-        self.screen = pygame.display.set_mode((self.screen_width, self.screen_height))
-        pygame.display.set_caption("Helwan Linux Game")
+        with startup.step("display"):
+            self.screen_width = int(Config.get('graphics', 'width'))
+            self.screen_height = int(Config.get('graphics', 'height'))
+            self.screen = pygame.display.set_mode((self.screen_width, self.screen_height))
+            pygame.display.set_caption("Helwan Linux Game")
 
         self.running = True
         self.clock = pygame.time.Clock()
 
-        self.data_file = get_asset_path('game_data.json') # Path for game data
+        # Fixed-rate simulation: logic always advances in steps of sim_dt, whatever the render FPS
+        self.sim_dt = 1.0 / sim_rate
+        self.max_fps = max_fps
+        self.max_frame_time = 0.25 # Longer stalls (asset loads, GC, saving) are not caught up
+        self.max_steps_per_frame = 5 # Catch-up cap so a slow frame cannot snowball
+
+        # Optional dirty-rect rendering for the game screen (see render_pygame.py)
+        self.renderer = DirtyRectRenderer((self.screen_width, self.screen_height), dirty_threshold) if dirty_rects else None
+
+        # Frame-timing overlay, toggled with F3
+        self.profiler = FrameProfiler()
+        self._phase_timer = PhaseTimer()
+
+        # Saves live in the per-user data directory (the install directory may be read-only)
+        # and are written atomically on a background thread
+        self.data_file = get_user_data_path('game_data.json')
+        self.legacy_data_file = get_asset_path('game_data.json') # Read once if there is no per-user save yet
+        self.persistence = PersistenceWriter(self.data_file)
 
         # Game state/data
         self.high_score = 0
         self.music_volume = 1.0
         self.sfx_volume = 1.0
 
-        self.load_game_data() # Load data before setting up screens that might use volumes
+        with startup.step("load game data"):
+            self.load_game_data() # Load data before setting up screens that might use volumes
+        # Read by PygameScreenManager when building the game widget
+        self.use_array_store = use_array_store
+        self.continuous_collisions = continuous_collisions
+        self.pixel_collisions = pixel_collisions
+        # Record every game played this session (seed + per-step keys) for replay.py
+        self.recorder = InputRecorder(record_path) if record_path else None
 
-        # PygameScreenManager acts as the Kivy ScreenManager
-        self.root = PygameScreenManager(app_ref=self, initial_width=self.screen_width, initial_height=self.screen_height)
-        # game_widget is now directly accessible via self.root.game_widget
+        # Images and sounds from assets/manifest.json are decoded on worker threads
+        # while the menu shows; the main loop installs them a few ms per frame
+        self.preloader = AssetPreloader((self.screen_width, self.screen_height), self.sfx_volume)
+        self.preload_budget = 0.004 # Seconds of main-thread asset work per frame
+        with startup.step("start asset preloader"):
+            self.preloader.start()
+
+        # PygameScreenManager acts as the Kivy ScreenManager; it builds the menu now
+        # and everything else (including the game widget) on first use
+        with startup.step("screen manager"):
+            self.root = PygameScreenManager(app_ref=self, initial_width=self.screen_width, initial_height=self.screen_height)
+
+        # Optional periodic metrics (FPS, frame-time histogram, entity counts, GC pauses...)
+        # written as JSON lines by a background thread, for charting long sessions
+        self.metrics = None
+        if metrics_path or metrics_socket:
+            self.metrics = MetricsExporter(self, MetricsSink(metrics_path, metrics_socket), metrics_interval)
+            self.metrics.start()
+
+    def load_game_assets(self):
+        """Blocks until every preloaded asset is ready; called before the first game."""
+        if not self.preloader.done:
+            with startup.step("wait for assets"):
+                self.preloader.wait()
 
     def load_game_data(self):
+        path = self.data_file
+        if not os.path.exists(path) and os.path.exists(self.legacy_data_file):
+            path = self.legacy_data_file
         try:
-            with open(self.data_file, 'r') as f:
+            with open(path, 'r') as f:
                 data = json.load(f)
                 self.high_score = data.get('high_score', 0)
                 self.music_volume = data.get('music_volume', 1.0)
@@ -80,20 +155,22 @@ class PygameApp:
                 pygame.mixer.music.set_volume(self.music_volume)
                 # For SFX, you'd usually set volume on individual sound objects when played
             
-            print("Game data loaded successfully.")
+            log.info("Game data loaded successfully.")
+            if path != self.data_file:
+                self.save_game_data() # Copy the old save to the per-user location
         except FileNotFoundError:
-            print("Game data file not found. Starting with default settings.")
+            log.info("Game data file not found. Starting with default settings.")
             # Save defaults if file not found to create it
             self.save_game_data()
         except json.JSONDecodeError:
-            print("Error decoding game data. Starting with default settings.")
+            log.warning("Error decoding game data. Starting with default settings.")
             # Attempt to reset and save defaults on decode error
             self.high_score = 0
             self.music_volume = 1.0
             self.sfx_volume = 1.0
             self.save_game_data()
         except Exception as e:
-            print(f"An unexpected error occurred while loading game data: {e}")
+            log.error("An unexpected error occurred while loading game data: %s", e)
 
     def save_game_data(self):
         data = {
@@ -101,41 +178,146 @@ class PygameApp:
             'music_volume': self.music_volume,
             'sfx_volume': self.sfx_volume
         }
+        self.persistence.save(data) # Returns immediately; the writer thread coalesces and writes
+
+    def dump_log(self):
+        """Writes the recent log records (the ring buffer) to log-dump.txt in the user data dir."""
+        path = get_user_data_path('log-dump.txt')
         try:
-            with open(self.data_file, 'w') as f:
-                json.dump(data, f, indent=4) # Use indent for readability
-            print("Game data saved successfully.")
-        except Exception as e:
-            print(f"An error occurred while saving game data: {e}")
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            count = dump_ring_buffer(path)
+        except OSError as e:
+            log.error("Could not write the log dump: %s", e)
+            return
+        log.info("Wrote %d log records to %s", count, path)
 
     def run(self):
-        dt = 0 # Delta time for game updates
+        phases = self._phase_timer
+        accumulator = 0.0 # Real time not yet consumed by simulation steps
+        previous_time = time.perf_counter()
 
         while self.running:
+            now = time.perf_counter()
+            frame_time = now - previous_time # Whole previous frame, including the tick() wait
+            accumulator += min(frame_time, self.max_frame_time)
+            previous_time = now
+            if self.metrics:
+                self.metrics.frame(frame_time)
+
+            phases.start()
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
                     self.running = False
+                elif event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+                    self.profiler.toggle()
+                    if self.renderer:
+                        self.renderer.invalidate() # Erase or paint the overlay with a full frame
+                    continue
+                elif event.type == pygame.KEYDOWN and event.key == pygame.K_F4:
+                    self.dump_log()
+                    continue
                 
                 # Delegate event handling to the current screen
                 if self.root.current_screen:
                     self.root.current_screen.handle_event(event)
+            if not self.preloader.done:
+                self.preloader.poll(self.preload_budget) # Idle menu frames finish loading the assets
+            phases.mark('events')
 
-            # Update current screen's content (if it has an update method)
-            if hasattr(self.root.current_screen, 'update'):
-                self.root.current_screen.update(dt)
+            # Update current screen's content (if it has an update method) in fixed steps
+            game_widget = self.root.game_widget if self.root.game_widget_loaded else None
+            collision_time = 0.0
+            steps = 0
+            while accumulator >= self.sim_dt and steps < self.max_steps_per_frame:
+                if hasattr(self.root.current_screen, 'update'):
+                    self.root.current_screen.update(self.sim_dt)
+                    collision_time += game_widget.collision_time
+                accumulator -= self.sim_dt
+                steps += 1
+            if steps == self.max_steps_per_frame:
+                accumulator = min(accumulator, self.sim_dt) # Drop the backlog instead of spiralling
+            # Render between the last two simulation states
+            if game_widget:
+                game_widget.render_alpha = accumulator / self.sim_dt
+            phases.mark('update')
+            # check_collisions runs inside the game update; report it as its own phase
+            phases.timings['update'] -= collision_time
+            phases.timings['collisions'] = collision_time
             
-            # Draw current screen's content
+            # Draw current screen's content; screens may return dirty rects instead of needing a flip
+            dirty_rects = None
             if self.root.current_screen:
-                self.root.current_screen.draw(self.screen)
+                dirty_rects = self.root.current_screen.draw(self.screen)
+            if self.profiler.visible:
+                if game_widget:
+                    self.profiler.draw(self.screen, game_widget.entities.counts(), game_widget.timer_queue_length(),
+                                       game_widget.pool_stats())
+                else:
+                    self.profiler.draw(self.screen)
+                if self.renderer:
+                    self.renderer.invalidate()
+                dirty_rects = None
+            phases.mark('draw')
 
-            pygame.display.flip() # Update the full display Surface to the screen
-            dt = self.clock.tick(60) / 1000.0 # Limit to 60 FPS and get delta time in seconds
+            if dirty_rects is None:
+                pygame.display.flip() # Update the full display Surface to the screen
+            else:
+                pygame.display.update(dirty_rects) # Only the areas that changed
+            phases.mark('flip')
+            self.profiler.record(phases.timings)
+            startup.report() # Only prints (once) with --startup-trace
+            self.clock.tick(self.max_fps) # Limit the render rate; simulation time is tracked above
 
-        print("DEBUG: PygameApp.run() loop finished. Quitting Pygame.")
+        log.debug("PygameApp.run() loop finished. Quitting Pygame.")
+        if self.recorder is not None and self.recorder.recording:
+            self.recorder.finish(self.root.game_widget.score) # Game quit mid-play: keep what was recorded
         self.save_game_data() # Save data on exit
+        self.persistence.close() # Wait for the write to reach the disk
+        if self.metrics:
+            self.metrics.close()
         pygame.quit()
         sys.exit() # Ensure process exits
 
 if __name__ == '__main__':
-    app = PygameApp()
+    parser = argparse.ArgumentParser(description="Hel Space Fight")
+    parser.add_argument('--dirty-rects', action='store_true',
+                        help="Repaint only the areas that changed (faster on low-end machines)")
+    parser.add_argument('--dirty-threshold', type=float, default=0.35,
+                        help="Fraction of the screen above which a full flip is used instead")
+    parser.add_argument('--sim-rate', type=int, default=60,
+                        help="Simulation steps per second (independent of the render rate)")
+    parser.add_argument('--max-fps', type=int, default=60, help="Render frame-rate cap (0 = uncapped)")
+    parser.add_argument('--array-store', action='store_true',
+                        help="Move bullets/enemies/power-ups as NumPy batches (needs python-numpy)")
+    parser.add_argument('--discrete-collisions', action='store_true',
+                        help="Only test bullets where they end each step (fast bullets may pass through enemies)")
+    parser.add_argument('--pixel-collisions', action='store_true',
+                        help="Only count hits where the sprites' opaque pixels touch")
+    parser.add_argument('--record', metavar='PATH',
+                        help="Record the game's seed and inputs to PATH (play back with replay.py)")
+    parser.add_argument('--startup-trace', action='store_true',
+                        help="Print the time spent in each import and init step up to the first frame "
+                             "(run with python -X importtime for a per-module breakdown)")
+    parser.add_argument('--log-level', default='info', choices=LOG_LEVELS,
+                        help="Default level for every subsystem")
+    parser.add_argument('--log', action='append', metavar='SUBSYSTEM=LEVEL', default=[],
+                        help="Level for one subsystem (" + ', '.join(LOG_SUBSYSTEMS) + "); repeatable. "
+                             "F4 in the game writes the recent records to log-dump.txt")
+    parser.add_argument('--metrics', metavar='PATH',
+                        help="Append runtime metrics (FPS, frame times, entities, GC pauses...) to PATH as JSON lines")
+    parser.add_argument('--metrics-socket', metavar='PATH',
+                        help="Send the metrics JSON lines to a Unix socket listening at PATH instead")
+    parser.add_argument('--metrics-interval', type=float, default=5.0, metavar='SECONDS',
+                        help="Seconds between metrics samples")
+    args = parser.parse_args()
+    try:
+        configure_logging(args.log_level, parse_levels(args.log))
+    except ValueError as e:
+        parser.error(str(e))
+
+    app = PygameApp(dirty_rects=args.dirty_rects, dirty_threshold=args.dirty_threshold,
+                    sim_rate=args.sim_rate, max_fps=args.max_fps, use_array_store=args.array_store,
+                    record_path=args.record, continuous_collisions=not args.discrete_collisions,
+                    pixel_collisions=args.pixel_collisions, metrics_path=args.metrics,
+                    metrics_socket=args.metrics_socket, metrics_interval=args.metrics_interval)
     app.run()
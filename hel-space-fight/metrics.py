@@ -0,0 +1,198 @@
+import gc
+import json
+import time
+import queue
+import socket
+import threading
+from bisect import bisect_left
+
+from audio_pygame import SoundBank
+from game_log import get_logger
+
+log = get_logger('metrics')
+
+# Upper bounds (ms) of the frame-time histogram buckets; the last bucket catches the rest
+FRAME_TIME_BUCKETS = (4.0, 8.0, 12.0, 16.7, 20.0, 25.0, 33.3, 50.0, 100.0)
+
+
+class GCPauseTracker:
+    """Times garbage collections through gc.callbacks: count, total and longest pause per generation."""
+    def __init__(self):
+        self._started = None
+        self.reset()
+
+    def install(self):
+        if self._callback not in gc.callbacks:
+            gc.callbacks.append(self._callback)
+
+    def uninstall(self):
+        if self._callback in gc.callbacks:
+            gc.callbacks.remove(self._callback)
+
+    def reset(self):
+        self.collections = [0, 0, 0]
+        self.total = [0.0, 0.0, 0.0] # Seconds
+        self.longest = 0.0
+
+    def _callback(self, phase, info):
+        # Runs in whichever thread triggered the collection, with the GIL held
+        if phase == 'start':
+            self._started = time.perf_counter()
+        elif self._started is not None:
+            pause = time.perf_counter() - self._started
+            self._started = None
+            generation = info['generation']
+            self.collections[generation] += 1
+            self.total[generation] += pause
+            self.longest = max(self.longest, pause)
+
+
+class MetricsSink:
+    """Writes JSON lines to a file (appended) or to a listening Unix socket.
+
+    A socket that is not there (yet) or goes away is retried on the next
+    write; lines written meanwhile are dropped and counted in `dropped`.
+    """
+    def __init__(self, path=None, socket_path=None):
+        self.path = path
+        self.socket_path = socket_path
+        self.dropped = 0
+        self._file = None
+        self._socket = None
+
+    def write(self, line):
+        data = line + '\n'
+        try:
+            if self.socket_path:
+                if self._socket is None:
+                    self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+                    self._socket.connect(self.socket_path)
+                self._socket.sendall(data.encode())
+            else:
+                if self._file is None:
+                    self._file = open(self.path, 'a')
+                self._file.write(data)
+                self._file.flush()
+        except OSError as e:
+            if not self.dropped:
+                log.warning("Could not write metrics to %s: %s", self.socket_path or self.path, e)
+            self.dropped += 1
+            self.close()
+
+    def close(self):
+        for stream in (self._file, self._socket):
+            if stream is not None:
+                try:
+                    stream.close()
+                except OSError:
+                    pass
+        self._file = self._socket = None
+
+
+class MetricsExporter:
+    """Samples PygameApp every `interval` seconds and writes the samples from a background thread.
+
+    The main loop calls frame(seconds) once per frame: that only bins the
+    frame time and, when the interval is up, builds one dict of plain
+    numbers (counters are read on the main thread, so a sample is
+    consistent). JSON encoding and I/O happen on the 'metrics-writer'
+    thread; if the sink falls behind, whole samples are dropped instead of
+    stalling a frame. Counters are totals since launch, gauges are current
+    values, and frame/GC figures cover the last interval.
+    """
+    def __init__(self, app, sink, interval=5.0, max_queued=64):
+        self.app = app
+        self.sink = sink
+        self.interval = interval
+        self.samples_written = 0
+        self.samples_dropped = 0 # Queue full (sink too slow)
+
+        self.gc_pauses = GCPauseTracker()
+        self._queue = queue.Queue(max_queued)
+        self._thread = threading.Thread(target=self._run, name='metrics-writer', daemon=True)
+        self._started = time.perf_counter()
+        self._reset_interval(self._started)
+
+    def start(self):
+        self.gc_pauses.install()
+        self._thread.start()
+
+    def frame(self, seconds):
+        milliseconds = seconds * 1000.0
+        self._histogram[bisect_left(FRAME_TIME_BUCKETS, milliseconds)] += 1
+        self._frames += 1
+        self._frame_time += seconds
+        if milliseconds > self._worst_frame:
+            self._worst_frame = milliseconds
+        now = time.perf_counter()
+        if now - self._interval_start >= self.interval:
+            self._enqueue(self.sample(now))
+
+    def sample(self, now=None):
+        """Builds a sample of the current interval and starts the next one."""
+        now = time.perf_counter() if now is None else now
+        elapsed = now - self._interval_start
+        gc_pauses = self.gc_pauses
+        sample = {
+            'time': time.time(),
+            'uptime': round(now - self._started, 3),
+            'interval': round(elapsed, 3),
+            'fps': round(self._frames / elapsed, 2) if elapsed > 0 else 0.0,
+            'frame_ms': {
+                'mean': round(self._frame_time * 1000.0 / self._frames, 3) if self._frames else 0.0,
+                'worst': round(self._worst_frame, 3),
+                'buckets': FRAME_TIME_BUCKETS,
+                'counts': self._histogram,
+            },
+            'gc': {
+                'collections': gc_pauses.collections,
+                'pause_ms': [round(total * 1000.0, 3) for total in gc_pauses.total],
+                'longest_ms': round(gc_pauses.longest * 1000.0, 3),
+            },
+            'sounds_played': SoundBank.played,
+            'screen': self.app.root.current,
+        }
+        root = self.app.root
+        if root.game_widget_loaded:
+            game = root.game_widget
+            bullet_pool = game.bullet_pool
+            sample.update({
+                'entities': game.entities.counts(),
+                'spawned': game.spawned,
+                'bullets_fired': bullet_pool.created + bullet_pool.reused,
+                'collision_pairs': game.collision_pairs_total,
+                'timer_queue': game.timer_queue_length(),
+            })
+        self._reset_interval(now)
+        return sample
+
+    def close(self, timeout=2.0):
+        """Writes a last sample, then stops the writer thread."""
+        self.gc_pauses.uninstall()
+        if self._thread.is_alive():
+            self._enqueue(self.sample())
+            self._queue.put(None)
+            self._thread.join(timeout)
+        self.sink.close()
+
+    def _reset_interval(self, now):
+        self._interval_start = now
+        self._frames = 0
+        self._frame_time = 0.0
+        self._worst_frame = 0.0
+        self._histogram = [0] * (len(FRAME_TIME_BUCKETS) + 1) # A new list: the queued sample keeps the old one
+        self.gc_pauses.reset()
+
+    def _enqueue(self, sample):
+        try:
+            self._queue.put_nowait(sample)
+        except queue.Full:
+            self.samples_dropped += 1
+
+    def _run(self):
+        while True:
+            sample = self._queue.get()
+            if sample is None:
+                return
+            self.sink.write(json.dumps(sample, separators=(',', ':')))
+            self.samples_written += 1
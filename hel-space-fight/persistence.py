@@ -0,0 +1,128 @@
+import os
+import json
+import time
+import tempfile
+import threading
+
+from game_log import get_logger
+
+log = get_logger('persistence')
+
+
+def atomic_write_json(path, data):
+    """Writes `data` as JSON so that `path` always holds either the old or the new file.
+
+    The JSON goes to a temporary file in the same directory, is fsynced,
+    then renamed over `path`; a crash mid-save can never leave a truncated
+    file behind.
+    """
+    directory = os.path.dirname(path) or '.'
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(prefix='.' + os.path.basename(path) + '.', suffix='.tmp', dir=directory)
+    try:
+        with os.fdopen(fd, 'w') as f:
+            json.dump(data, f, indent=4) # Use indent for readability
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+    if hasattr(os, 'O_DIRECTORY'): # Make the rename itself durable (POSIX only)
+        try:
+            dir_fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+            try:
+                os.fsync(dir_fd)
+            finally:
+                os.close(dir_fd)
+        except OSError:
+            pass
+
+
+class PersistenceWriter:
+    """Saves JSON data on a background thread, so saving never stalls a frame.
+
+    save() only records the latest data and wakes the writer, which waits
+    `debounce` seconds for further saves before writing (at most `max_delay`
+    in total): a burst of saves (settings changes, a new high score right
+    before quitting...) becomes a single atomic write of the newest data.
+    flush() blocks until everything saved so far is on disk; close() flushes
+    and stops the thread.
+    """
+    def __init__(self, path, debounce=0.5, max_delay=3.0):
+        self.path = path
+        self.debounce = debounce
+        self.max_delay = max_delay
+        self.writes = 0 # Files actually written
+        self.requests = 0 # save() calls, for comparison
+        self.last_error = None
+
+        self._condition = threading.Condition()
+        self._pending = None # Latest unsaved data
+        self._version = 0 # Incremented by save()
+        self._written_version = 0 # Version of the last data written (or failed)
+        self._flushing = False
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name='persistence-writer', daemon=True)
+        self._thread.start()
+
+    def save(self, data):
+        payload = json.loads(json.dumps(data)) # Snapshot now; the caller may keep mutating its dict
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("PersistenceWriter is closed")
+            self._pending = payload
+            self._version += 1
+            self.requests += 1
+            self._condition.notify_all()
+
+    def flush(self, timeout=None):
+        """Writes pending data now and waits for it; returns False on timeout."""
+        with self._condition:
+            target = self._version
+            self._flushing = True
+            self._condition.notify_all()
+            done = self._condition.wait_for(lambda: self._written_version >= target, timeout)
+            self._flushing = False
+            return done
+
+    def close(self, timeout=5.0):
+        self.flush(timeout)
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        self._thread.join(timeout)
+
+    def _run(self):
+        condition = self._condition
+        while True:
+            with condition:
+                condition.wait_for(lambda: self._pending is not None or self._closed)
+                if self._pending is None: # Closed with nothing left to write
+                    return
+                # Debounce: restart the wait whenever another save arrives
+                deadline = time.monotonic() + self.max_delay
+                while not (self._flushing or self._closed):
+                    seen = self._version
+                    wait = min(self.debounce, deadline - time.monotonic())
+                    if wait <= 0 or not condition.wait_for(
+                            lambda: self._version != seen or self._flushing or self._closed, wait):
+                        break # Quiet for `debounce` seconds, or waited long enough
+                data, version = self._pending, self._version
+                self._pending = None
+
+            try:
+                atomic_write_json(self.path, data)
+                self.writes += 1
+                self.last_error = None
+                log.info("Game data saved successfully.")
+            except Exception as e:
+                self.last_error = e
+                log.error("An error occurred while saving game data: %s", e)
+
+            with condition:
+                self._written_version = version
+                condition.notify_all()
@@ -0,0 +1,152 @@
+import os
+import time
+import queue
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from utils import load_asset_manifest
+from assets_pygame import ImageCache, SpriteAtlas, manifest_images
+from animation_pygame import AnimationCache, manifest_animations
+from audio_pygame import SoundBank, manifest_sounds
+from game_log import get_logger
+
+log = get_logger('assets')
+
+
+class AssetPreloader:
+    """Loads everything listed in assets/manifest.json, decoding files on a thread pool.
+
+    Reading and decoding the PNG/WAV files (the slow part) runs on worker
+    threads; pygame releases the GIL while SDL decodes. What needs the
+    display or touches the caches -- convert_alpha, scaling, the sprite
+    atlas, baking animations -- runs on the main thread in poll(), a few
+    milliseconds per frame while the menu is idle, or all at once in wait().
+    `ready` is a Future that completes when every file has been decoded.
+    """
+    def __init__(self, screen_size, sfx_volume=1.0, manifest=None, max_workers=None):
+        self.manifest = manifest if manifest is not None else load_asset_manifest()
+        self.screen_size = (int(screen_size[0]), int(screen_size[1]))
+        self.sfx_volume = sfx_volume
+        self.max_workers = max_workers or min(4, os.cpu_count() or 1)
+        self.ready = Future()
+        self.completed = 0 # Main-thread steps done
+        self.total = 0
+        self.started_at = None
+        self.finished_at = None
+
+        self._executor = None
+        self._lock = threading.Lock()
+        self._decoding = 0 # Files still being decoded by the workers
+        self._decoded = queue.SimpleQueue() # (install, future) pairs, filled by the workers
+        self._installs_left = 0 # Decoded files not yet installed on the main thread
+        self._final_steps = deque() # Steps that need every file installed first
+
+    @property
+    def started(self):
+        return self.started_at is not None
+
+    @property
+    def done(self):
+        return self.started and self.completed >= self.total
+
+    @property
+    def progress(self):
+        """Fraction of the work done, from 0.0 to 1.0."""
+        return self.completed / self.total if self.total else float(self.done)
+
+    def start(self):
+        if self.started:
+            return
+        self.started_at = time.perf_counter()
+        images = self._sizes_by_file(manifest_images(self.manifest))
+        backgrounds = [entry['file'] for entry in self.manifest.get('backgrounds', [])]
+        animations = manifest_animations(self.manifest)
+        sounds = manifest_sounds(self.manifest)
+        SoundBank.init(self.sfx_volume)
+
+        jobs = [] # (decode function, argument, install function)
+        for source in dict.fromkeys(list(images) + backgrounds + [source for source, _ in animations]):
+            jobs.append((ImageCache.decode, source,
+                         lambda image, source=source: self._install_image(source, image, images.get(source, ()),
+                                                                          source in backgrounds)))
+        for name, filename, max_voices in sounds:
+            jobs.append((SoundBank.decode, filename,
+                         lambda sound, name=name, max_voices=max_voices: SoundBank.add(name, sound, max_voices)))
+
+        self._final_steps.append(lambda: SpriteAtlas.build(manifest_images(self.manifest)))
+        for source, size in animations:
+            self._final_steps.append(lambda source=source, size=size: AnimationCache.get(source, size))
+        self._installs_left = self._decoding = len(jobs)
+        self.total = len(jobs) + len(self._final_steps)
+
+        if not jobs:
+            self.ready.set_result(None)
+            return
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='asset-decoder')
+        for decode, argument, install in jobs:
+            future = self._executor.submit(decode, argument)
+            future.add_done_callback(lambda future, install=install: self._on_decoded(install, future))
+
+    def poll(self, budget=None):
+        """Runs main-thread steps whose files are decoded, for at most `budget` seconds (None = no limit).
+
+        Never blocks on the workers. Returns the progress.
+        """
+        if not self.started:
+            self.start()
+        deadline = None if budget is None else time.perf_counter() + budget
+        while not self.done:
+            if deadline is not None and time.perf_counter() >= deadline:
+                break
+            try:
+                install, future = self._decoded.get_nowait()
+            except queue.Empty:
+                if self._installs_left:
+                    break # Still decoding; try again next frame
+                try:
+                    self._final_steps.popleft()()
+                except Exception:
+                    # Assets not built here are loaded on first use instead
+                    log.exception("An error occurred while preparing the preloaded assets")
+            else:
+                try:
+                    install(future.result())
+                except Exception:
+                    log.exception("An error occurred while preloading assets")
+                self._installs_left -= 1
+            self.completed += 1
+        if self.done and self.finished_at is None:
+            self.finished_at = time.perf_counter()
+            if self._executor:
+                self._executor.shutdown(wait=False)
+        return self.progress
+
+    def wait(self, timeout=None):
+        """Blocks until every file is decoded, then finishes the main-thread steps."""
+        if not self.started:
+            self.start()
+        self.ready.result(timeout)
+        self.poll()
+
+    def _on_decoded(self, install, future):
+        # Runs on a worker thread
+        self._decoded.put((install, future))
+        with self._lock:
+            self._decoding -= 1
+            last = self._decoding == 0
+        if last:
+            self.ready.set_result(None)
+
+    def _install_image(self, source, image, sizes, background):
+        ImageCache.add_original(source, image)
+        ImageCache.preload((source, size) for size in sizes)
+        if background:
+            ImageCache.get_opaque(source, self.screen_size)
+
+    @staticmethod
+    def _sizes_by_file(entries):
+        sizes = {}
+        for source, size in entries:
+            sizes.setdefault(source, []).append(size)
+        return sizes
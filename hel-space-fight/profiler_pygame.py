@@ -0,0 +1,128 @@
+import time
+
+import pygame
+
+# Frame phases measured by PygameApp.run, with their colour in the graph
+PHASES = ('events', 'update', 'collisions', 'draw', 'flip')
+PHASE_COLORS = {
+    'events': (160, 160, 160),
+    'update': (0, 180, 255),
+    'collisions': (255, 200, 0),
+    'draw': (0, 220, 100),
+    'flip': (255, 80, 80),
+}
+
+
+class FrameProfiler:
+    """Per-phase frame timings kept in a fixed-size ring buffer, plus an overlay.
+
+    PygameApp.run records one sample per phase per frame; nothing is allocated
+    per frame. The overlay (toggled with F3) shows the averages, a rolling
+    stacked graph of the last `history` frames, live entity counts per kind
+    and the timer-queue length.
+    """
+    def __init__(self, history=240):
+        self.history = history
+        self.samples = {phase: [0.0] * history for phase in PHASES} # Seconds, ring buffers
+        self.index = 0 # Next slot to write
+        self.count = 0 # Number of valid samples (<= history)
+        self.visible = False
+
+        self._font = None
+        self._panel = None
+        self._text_surfaces = []
+        self._text_refresh = 0 # Frames until the text is re-rendered
+
+    def record(self, timings):
+        """Stores one frame; `timings` maps phase name -> seconds."""
+        i = self.index
+        for phase in PHASES:
+            self.samples[phase][i] = timings.get(phase, 0.0)
+        self.index = (i + 1) % self.history
+        self.count = min(self.count + 1, self.history)
+
+    def averages(self):
+        if not self.count:
+            return {phase: 0.0 for phase in PHASES}
+        return {phase: sum(values) / self.count for phase, values in self.samples.items()}
+
+    def worst_frame(self):
+        if not self.count:
+            return 0.0
+        return max(sum(self.samples[phase][i] for phase in PHASES) for i in range(self.count))
+
+    def toggle(self):
+        self.visible = not self.visible
+        self._text_refresh = 0
+
+    def draw(self, screen, entity_counts=None, timer_queue_length=0, pool_stats=None):
+        if not self.visible:
+            return
+        if self._font is None:
+            self._font = pygame.font.Font(None, 20)
+            self._panel = pygame.Surface((self.history + 60, 285), pygame.SRCALPHA)
+            self._panel.fill((0, 0, 0, 170))
+        screen.blit(self._panel, (5, 5))
+
+        # Text is re-rendered a few times per second only, the graph every frame
+        if self._text_refresh <= 0:
+            self._text_surfaces = self._render_text(entity_counts or {}, timer_queue_length, pool_stats or {})
+            self._text_refresh = 15
+        self._text_refresh -= 1
+        y = 10
+        for surface in self._text_surfaces:
+            screen.blit(surface, (12, y))
+            y += 16
+
+        self._draw_graph(screen, 15, 280)
+
+    def _render_text(self, entity_counts, timer_queue_length, pool_stats):
+        averages = self.averages()
+        total = sum(averages.values())
+        fps = 1.0 / total if total > 0 else 0.0
+        lines = [f"frame {total * 1000:6.2f} ms ({fps:5.1f} fps)  worst {self.worst_frame() * 1000:6.2f} ms"]
+        for phase in PHASES:
+            lines.append((f"{phase:<11}{averages[phase] * 1000:6.2f} ms", PHASE_COLORS[phase]))
+        counts = "  ".join(f"{kind} {count}" for kind, count in entity_counts.items())
+        lines.append(f"entities: {counts}" if counts else "entities: -")
+        lines.append(f"timers queued: {timer_queue_length}")
+        for name, stats in pool_stats.items():
+            lines.append(f"pool {name}: {stats['in_use']} in use, {stats['free']} free, {stats['created']} created")
+        surfaces = []
+        for line in lines:
+            text, color = line if isinstance(line, tuple) else (line, (255, 255, 255))
+            surfaces.append(self._font.render(text, True, color))
+        return surfaces
+
+    def _draw_graph(self, screen, left, bottom):
+        # Stacked bars, oldest on the left; 2 px per millisecond, 16.7 ms budget line
+        scale = 2000.0
+        budget_y = bottom - int(scale / 60)
+        pygame.draw.line(screen, (255, 255, 255), (left, budget_y), (left + self.history, budget_y))
+        start = (self.index - self.count) % self.history
+        for n in range(self.count):
+            i = (start + n) % self.history
+            x = left + n
+            y = bottom
+            for phase in PHASES:
+                height = int(self.samples[phase][i] * scale)
+                if height > 0:
+                    top = max(y - height, bottom - 100)
+                    pygame.draw.line(screen, PHASE_COLORS[phase], (x, y), (x, top))
+                    y = top
+
+
+class PhaseTimer:
+    """Small helper used by the main loop: `mark(phase)` closes the current phase."""
+    def __init__(self):
+        self.timings = {}
+        self._last = time.perf_counter()
+
+    def start(self):
+        self.timings.clear()
+        self._last = time.perf_counter()
+
+    def mark(self, phase):
+        now = time.perf_counter()
+        self.timings[phase] = self.timings.get(phase, 0.0) + now - self._last
+        self._last = now
@@ -0,0 +1,52 @@
+import pygame
+
+
+class DirtyRectRenderer:
+    """Repaints only what moved instead of the whole 800x600 frame.
+
+    Each frame the background is restored under the rects drawn last frame,
+    the scene is drawn again, and only the old + new rects are pushed with
+    pygame.display.update(rects). When the dirty area grows past
+    `threshold` (fraction of the screen) a full flip is cheaper, so commit()
+    returns None and the caller falls back to pygame.display.flip().
+    """
+    def __init__(self, screen_size, threshold=0.35):
+        self.screen_rect = pygame.Rect((0, 0), screen_size)
+        self.threshold = threshold
+        self._previous = [] # Rects drawn last frame (to be erased this frame)
+        self.needs_full_redraw = True
+        self.full_frames = 0
+        self.dirty_frames = 0
+
+    def invalidate(self):
+        """Forces the next frame to be a full redraw (screen change, overlays...)."""
+        self.needs_full_redraw = True
+
+    def restore(self, screen, background):
+        """Paints the background back under everything drawn last frame."""
+        for rect in self._previous:
+            if background:
+                screen.blit(background, rect, rect)
+            else:
+                screen.fill((0, 0, 0), rect)
+
+    def reset(self, drawn_rects):
+        """Records a fully redrawn frame; the next frame can be incremental again."""
+        self._previous = drawn_rects
+        self.needs_full_redraw = False
+        self.full_frames += 1
+
+    def commit(self, drawn_rects):
+        """Returns the rects to update, or None when a full flip is cheaper."""
+        dirty = self._previous + drawn_rects
+        self._previous = drawn_rects
+
+        limit = self.threshold * self.screen_rect.width * self.screen_rect.height
+        area = 0
+        for rect in dirty:
+            area += rect.width * rect.height
+            if area > limit:
+                self.full_frames += 1
+                return None
+        self.dirty_frames += 1
+        return dirty
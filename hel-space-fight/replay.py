@@ -0,0 +1,227 @@
+"""Input recording and playback for GameWidget_Pygame sessions.
+
+A replay is the RNG seed the game was started with plus the pressed keys of
+every simulation step, which is all the simulation depends on. Record a
+session with `python main_pygame.py --record session.hsfr`, then replay it
+headless at full CPU speed and check it reaches the same score:
+
+    python replay.py session.hsfr
+
+File layout (little-endian):
+    header   magic b'HSFR', version (u16), seed (u64), dt (f64), screen width/height (u16 each),
+             simulation option bits (u8, version 2+)
+    runs     run count (u32), then per run: key bits (u8), ticks (u32)
+    trailer  total ticks (u32), final score (i64)
+"""
+import sys
+import json
+import struct
+import argparse
+
+from game_log import get_logger
+
+log = get_logger('replay')
+
+MAGIC = b'HSFR'
+VERSION = 2
+
+# One bit per key GameWidget_Pygame tracks in keysPressed
+KEY_BITS = {'left': 1, 'right': 2, 'spacebar': 4}
+# One bit per GameWidget_Pygame.simulation_options() flag; unset in version 1 files
+OPTION_BITS = {'continuous_collisions': 1, 'pixel_collisions': 2}
+
+_HEADER_V1 = struct.Struct('<4sHQdHH')
+_HEADER = struct.Struct('<4sHQdHHB')
+_COUNT = struct.Struct('<I')
+_RUN = struct.Struct('<BI')
+_TRAILER = struct.Struct('<Iq')
+
+
+class ReplayError(Exception):
+    pass
+
+
+def encode_keys(keys):
+    bits = 0
+    for key in keys:
+        bits |= KEY_BITS.get(key, 0)
+    return bits
+
+
+def decode_keys(bits):
+    return {key for key, bit in KEY_BITS.items() if bits & bit}
+
+
+def encode_options(options):
+    bits = 0
+    for name, enabled in options.items():
+        if enabled:
+            bits |= OPTION_BITS[name]
+    return bits
+
+
+def decode_options(bits):
+    return {name: bool(bits & bit) for name, bit in OPTION_BITS.items()}
+
+
+class Replay:
+    """A recorded session: header fields, run-length encoded key bits and the final score."""
+    def __init__(self, seed, dt, screen_size, runs=None, score=0, options=None):
+        self.seed = seed
+        self.dt = dt
+        self.screen_size = tuple(screen_size)
+        self.options = decode_options(encode_options(options or {})) # Simulation flags, keyed like OPTION_BITS
+        self.runs = runs if runs is not None else [] # [key bits, ticks] pairs
+        self.score = score
+
+    @property
+    def ticks(self):
+        return sum(count for _, count in self.runs)
+
+    def inputs(self):
+        """Yields the set of pressed keys for every tick, in order."""
+        for bits, count in self.runs:
+            keys = decode_keys(bits)
+            for _ in range(count):
+                yield keys
+
+    def to_bytes(self):
+        parts = [_HEADER.pack(MAGIC, VERSION, self.seed, self.dt, *self.screen_size, encode_options(self.options)),
+                 _COUNT.pack(len(self.runs))]
+        parts.extend(_RUN.pack(bits, count) for bits, count in self.runs)
+        parts.append(_TRAILER.pack(self.ticks, self.score))
+        return b''.join(parts)
+
+    @classmethod
+    def from_bytes(cls, data):
+        try:
+            magic, version = struct.unpack_from('<4sH', data, 0)
+            if magic != MAGIC:
+                raise ReplayError("not a replay file")
+            if version == 1:
+                _, _, seed, dt, width, height = _HEADER_V1.unpack_from(data, 0)
+                option_bits = 0
+                offset = _HEADER_V1.size
+            elif version == VERSION:
+                _, _, seed, dt, width, height, option_bits = _HEADER.unpack_from(data, 0)
+                offset = _HEADER.size
+            else:
+                raise ReplayError(f"unsupported replay version {version}")
+            (run_count,) = _COUNT.unpack_from(data, offset)
+            offset += _COUNT.size
+            runs = [list(run) for run in _RUN.iter_unpack(data[offset:offset + run_count * _RUN.size])]
+            offset += run_count * _RUN.size
+            ticks, score = _TRAILER.unpack_from(data, offset)
+        except struct.error as e:
+            raise ReplayError(f"truncated replay: {e}") from None
+        replay = cls(seed, dt, (width, height), runs, score, decode_options(option_bits))
+        if replay.ticks != ticks:
+            raise ReplayError("replay tick count does not match its runs")
+        return replay
+
+    def save(self, path):
+        with open(path, 'wb') as f:
+            f.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as f:
+            return cls.from_bytes(f.read())
+
+
+class InputRecorder:
+    """Attached to GameWidget_Pygame as `game.recorder`.
+
+    The game calls begin() from start_game, record() once per simulation
+    step and finish() from end_game; finish() writes the replay to `path`.
+    Only the most recent game of a session is kept.
+    """
+    def __init__(self, path):
+        self.path = path
+        self.replay = None
+
+    @property
+    def recording(self):
+        return self.replay is not None
+
+    def begin(self, seed, screen_size, options=None):
+        self.replay = Replay(seed, 0.0, screen_size, options=options)
+
+    def record(self, keys, dt):
+        replay = self.replay
+        if replay is None:
+            return
+        if not replay.dt:
+            replay.dt = dt
+        elif dt != replay.dt:
+            raise ReplayError("replays need a fixed simulation step")
+        bits = encode_keys(keys)
+        runs = replay.runs
+        if runs and runs[-1][0] == bits and runs[-1][1] < 0xFFFFFFFF:
+            runs[-1][1] += 1
+        else:
+            runs.append([bits, 1])
+
+    def finish(self, score):
+        replay = self.replay
+        if replay is None:
+            return None
+        self.replay = None
+        replay.score = score
+        try:
+            replay.save(self.path)
+            log.info("Replay saved to %s (%s ticks, score %s).", self.path, replay.ticks, score)
+        except OSError as e:
+            log.error("An error occurred while saving the replay: %s", e)
+        return replay
+
+
+def play_replay(replay, use_array_store=False, draw=False):
+    """Replays `replay` headless as fast as possible and returns the outcome."""
+    import time
+    from headless_pygame import init_headless, create_game # Switches SDL to the dummy drivers
+
+    screen = init_headless(*replay.screen_size)
+    game = create_game(replay.seed, *replay.screen_size, use_array_store=use_array_store, **replay.options)
+    frames = 0
+    started = time.perf_counter()
+    for keys in replay.inputs():
+        if not game.is_game_running:
+            break
+        game.keysPressed = set(keys)
+        game.update(replay.dt)
+        if draw:
+            game.draw(screen)
+        frames += 1
+    elapsed = time.perf_counter() - started
+
+    return {
+        'seed': replay.seed,
+        'frames': frames,
+        'expected_frames': replay.ticks,
+        'score': game.score,
+        'expected_score': replay.score,
+        'matches': game.score == replay.score and frames == replay.ticks,
+        'wall_time': elapsed,
+        'frames_per_second': frames / elapsed if elapsed > 0 else 0.0,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Play back a recorded session headless and verify its score.")
+    parser.add_argument('path')
+    parser.add_argument('--draw', action='store_true', help="Also render every frame off-screen")
+    parser.add_argument('--array-store', action='store_true', help="Use the NumPy array store for movers")
+    args = parser.parse_args(argv)
+
+    try:
+        replay = Replay.load(args.path)
+    except (OSError, ReplayError) as e:
+        print(f"Cannot load replay: {e}", file=sys.stderr)
+        return 2
+    result = play_replay(replay, args.array_store, args.draw)
+    print(json.dumps(result, indent=4))
+    return 0 if result['matches'] else 1
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,95 @@
+import heapq
+import itertools
+
+
+class TimerEvent:
+    """Handle returned by TimerScheduler; pass it to cancel()."""
+    __slots__ = ('callback', 'due', 'interval', 'canceled', 'scheduled', 'seq')
+
+    def __init__(self, callback, due, interval, seq):
+        self.callback = callback
+        self.due = due # Simulation time (seconds) at which the callback fires
+        self.interval = interval # Seconds between repeats, or None for one-shot timers
+        self.canceled = False
+        self.scheduled = False # True while the event sits in the heap
+        self.seq = seq # Tie-breaker: timers due at the same time fire in scheduling order
+
+    def __lt__(self, other):
+        return (self.due, self.seq) < (other.due, other.seq)
+
+
+class TimerScheduler:
+    """Min-heap of timers keyed on simulation time, owned by the game.
+
+    Time only moves when advance() is called from the game update, so timers
+    stop while the game is paused and run at simulation speed in headless
+    runs. Scheduling is O(log n). Cancellation is O(1): the entry is only
+    flagged and skipped when it reaches the top of the heap, and the heap is
+    compacted when canceled entries start to dominate it.
+    """
+    def __init__(self):
+        self.now = 0.0
+        self._heap = []
+        self._seq = itertools.count()
+        self._canceled = 0 # Canceled entries still sitting in the heap
+
+    def schedule_once(self, callback, delay):
+        return self._push(TimerEvent(callback, self.now + delay, None, next(self._seq)))
+
+    def schedule_interval(self, callback, interval):
+        """Calls `callback` every `interval` seconds until canceled."""
+        if interval <= 0:
+            raise ValueError("interval must be positive")
+        return self._push(TimerEvent(callback, self.now + interval, interval, next(self._seq)))
+
+    def cancel(self, event):
+        if event is None or event.canceled:
+            return
+        event.canceled = True
+        if event.scheduled:
+            self._canceled += 1
+            if self._canceled > 32 and self._canceled * 2 > len(self._heap):
+                self._compact()
+
+    def advance(self, dt):
+        """Moves simulation time forward by `dt` and fires every timer that is due."""
+        self.now += dt
+        heap = self._heap
+        while heap and heap[0].due <= self.now:
+            event = heapq.heappop(heap)
+            event.scheduled = False
+            if event.canceled:
+                self._canceled -= 1
+                continue
+            if event.interval is not None:
+                event.due += event.interval
+                event.seq = next(self._seq)
+                self._push(event)
+            event.callback()
+
+    def clear(self):
+        for event in self._heap:
+            event.scheduled = False
+        self._heap.clear()
+        self._canceled = 0
+        self.now = 0.0
+
+    def __len__(self):
+        """Number of live (not canceled) timers."""
+        return len(self._heap) - self._canceled
+
+    def _push(self, event):
+        event.scheduled = True
+        heapq.heappush(self._heap, event)
+        return event
+
+    def _compact(self):
+        live = []
+        for event in self._heap:
+            if event.canceled:
+                event.scheduled = False
+            else:
+                live.append(event)
+        heapq.heapify(live)
+        self._heap = live
+        self._canceled = 0
@@ -1,9 +1,14 @@
 import pygame
-import os
-import sys
+from contextlib import nullcontext
 
 from utils import get_asset_path
+from assets_pygame import ImageCache
+from audio_pygame import SoundBank
+from hud_pygame import FontCache, OverlayCache, CachedText
 from game_core_pygame import GameWidget_Pygame # Adjust import based on your structure
+from game_log import get_logger
+
+log = get_logger('screens')
 
 # --- Pygame Specific Implementations for Kivy Widgets ---
 
@@ -12,15 +17,16 @@ class PygameButton:
         self.text = text
         self.rect = pygame.Rect(rect)
         self.action = action # This action is expected to be a callable method
-        self.font = pygame.font.Font(None, 36)
+        self.font = FontCache.get(36)
         self.color = (0, 128, 255) # Blue
         self.text_color = (255, 255, 255) # White
+        # The label never changes, so render it once
+        self.text_surf = self.font.render(self.text, True, self.text_color)
+        self.text_rect = self.text_surf.get_rect(center=self.rect.center)
 
     def draw(self, screen):
         pygame.draw.rect(screen, self.color, self.rect)
-        text_surf = self.font.render(self.text, True, self.text_color)
-        text_rect = text_surf.get_rect(center=self.rect.center)
-        screen.blit(text_surf, text_rect)
+        screen.blit(self.text_surf, self.text_rect)
 
     def handle_click(self, pos):
         if self.rect.collidepoint(pos):
@@ -124,49 +130,88 @@ class PygameScreen:
         return False
 
     def on_enter(self):
-        print(f"Pygame Screen: Entered {self.name}.")
+        log.debug("Pygame Screen: Entered %s.", self.name)
         # Additional logic when screen is entered (e.g., play music)
 
     def on_leave(self):
-        print(f"Pygame Screen: Left {self.name}.")
+        log.debug("Pygame Screen: Left %s.", self.name)
         # Additional logic when screen is left (e.g., stop music)
 
 class PygameScreenManager:
     def __init__(self, app_ref, initial_width=800, initial_height=600):
         self.app = app_ref # Reference to the main app instance
-        self.screens = {}
+        self.screens = {} # Screens built so far
+        self._factories = {} # name -> callable building the screen on first use
         self._current_screen = None
         self._previous_screen = None # To go back from settings
 
-        # GameWidget is now directly part of the manager for easy access
+        # Only the menu is needed to show the first frame: the other screens, the game
+        # widget (music, HUD images) and the game assets are built the first time they are used
         self.game_music_path = get_asset_path("background_music.ogg")
-        self.game_widget = GameWidget_Pygame(self.app, self.game_music_path)
+        self._game_widget = None
 
-        self.add_screen(MainMenuScreen_Pygame(name='menu', app_ref=self.app))
-        self.add_screen(SettingsScreen_Pygame(name='settings', app_ref=self.app))
-        self.add_screen(GameScreen_Pygame(name='game', app_ref=self.app, game_widget=self.game_widget)) # Pass game_widget
-        self.add_screen(PauseScreen_Pygame(name='pause', app_ref=self.app)) # This line is calling the constructor
+        self.add_screen_factory('menu', lambda: MainMenuScreen_Pygame(name='menu', app_ref=self.app))
+        self.add_screen_factory('settings', lambda: SettingsScreen_Pygame(name='settings', app_ref=self.app))
+        self.add_screen_factory('game', lambda: GameScreen_Pygame(name='game', app_ref=self.app,
+                                                                  game_widget=self.game_widget)) # Pass game_widget
+        self.add_screen_factory('pause', lambda: PauseScreen_Pygame(name='pause', app_ref=self.app))
 
         self.current = 'menu' # Set initial screen
 
     def add_screen(self, screen_obj):
         self.screens[screen_obj.name] = screen_obj
 
+    def add_screen_factory(self, name, factory):
+        """Registers a screen that is only built when it is first shown."""
+        self._factories[name] = factory
+
+    def get_screen(self, name):
+        screen = self.screens.get(name)
+        if screen is None:
+            with self._trace_step(f"screen '{name}'"):
+                screen = self._factories[name]()
+            self.add_screen(screen)
+        return screen
+
+    @property
+    def game_widget(self):
+        """The GameWidget, created (with the game assets) on first access."""
+        if self._game_widget is None:
+            load_game_assets = getattr(self.app, 'load_game_assets', None)
+            if load_game_assets:
+                load_game_assets()
+            with self._trace_step("game widget"):
+                self._game_widget = GameWidget_Pygame(self.app, self.game_music_path,
+                                                      use_array_store=getattr(self.app, 'use_array_store', False),
+                                                      continuous_collisions=getattr(self.app, 'continuous_collisions', True),
+                                                      pixel_collisions=getattr(self.app, 'pixel_collisions', False))
+            self._game_widget.recorder = getattr(self.app, 'recorder', None)
+        return self._game_widget
+
+    @property
+    def game_widget_loaded(self):
+        return self._game_widget is not None
+
+    def _trace_step(self, name):
+        startup = getattr(self.app, 'startup', None)
+        return startup.step(name) if startup else nullcontext()
+
     @property
     def current(self):
         return self._current_screen.name if self._current_screen else None
 
     @current.setter
     def current(self, screen_name):
-        if screen_name not in self.screens:
-            print(f"Error: Screen '{screen_name}' does not exist.")
+        if screen_name not in self.screens and screen_name not in self._factories:
+            log.error("Screen '%s' does not exist.", screen_name)
             return
+        new_screen = self.get_screen(screen_name)
 
         if self._current_screen:
             self._current_screen.on_leave() # Call on_leave for old screen
 
-        print(f"DEBUG: Setting screen to: {screen_name}")
-        self._current_screen = self.screens[screen_name]
+        log.debug("Setting screen to: %s", screen_name)
+        self._current_screen = new_screen
         self._current_screen.on_enter() # Call on_enter for new screen
 
         # If transitioning to game screen, ensure game is running
@@ -192,7 +237,7 @@ class MainMenuScreen_Pygame(PygameScreen):
         center_x = self.app.screen_width / 2
 
         # Title Label
-        title_font = pygame.font.Font(None, 60)
+        title_font = FontCache.get(60)
         title_text_str = "Helwan Linux Game" # Store the raw text
         title_text_surf = title_font.render(title_text_str, True, (255, 255, 255))
         title_rect = title_text_surf.get_rect(center=(center_x, self.app.screen_height * 0.7))
@@ -203,17 +248,32 @@ class MainMenuScreen_Pygame(PygameScreen):
         self.buttons.append(PygameButton("Settings", (center_x - button_width/2, self.app.screen_height * 0.35 - button_height/2, button_width, button_height), self.open_settings))
         self.buttons.append(PygameButton("Exit", (center_x - button_width/2, self.app.screen_height * 0.2 - button_height/2, button_width, button_height), self.exit_game))
 
+        # Asset loading progress, shown at the bottom until the preloader is done
+        self.loading_label = CachedText(24, (160, 160, 160))
+        self.loading_rect = pygame.Rect(center_x - button_width / 2, self.app.screen_height * 0.9, button_width, 6)
+
+    def draw(self, screen):
+        super().draw(screen)
+        preloader = getattr(self.app, 'preloader', None)
+        if preloader is not None and not preloader.done:
+            pygame.draw.rect(screen, (60, 60, 60), self.loading_rect)
+            filled = self.loading_rect.copy()
+            filled.width = int(filled.width * preloader.progress)
+            pygame.draw.rect(screen, (0, 128, 255), filled)
+            label = self.loading_label.render(f"Loading assets... {int(preloader.progress * 100)}%")
+            screen.blit(label, label.get_rect(midbottom=(self.loading_rect.centerx, self.loading_rect.top - 4)))
+
     def start_game(self):
-        print("Pygame Main Menu: Start Game pressed.")
+        log.debug("Pygame Main Menu: Start Game pressed.")
         self.app.root.current = 'game' # Change screen to game
 
     def open_settings(self):
-        print("Pygame Main Menu: Settings pressed.")
+        log.debug("Pygame Main Menu: Settings pressed.")
         self.app.root._previous_screen = self.name # Store current screen to return to it
         self.app.root.current = 'settings'
 
     def exit_game(self):
-        print("Pygame Main Menu: Exit pressed.")
+        log.debug("Pygame Main Menu: Exit pressed.")
         pygame.event.post(pygame.event.Event(pygame.QUIT)) # Post QUIT event to end game loop
 
 class SettingsScreen_Pygame(PygameScreen):
@@ -226,8 +286,11 @@ class SettingsScreen_Pygame(PygameScreen):
         center_x = self.app.screen_width / 2
 
         # Fonts
-        self.title_font = pygame.font.Font(None, 50)
-        self.label_font = pygame.font.Font(None, 36)
+        self.title_font = FontCache.get(50)
+        self.label_font = FontCache.get(36)
+        # Volume labels are re-rendered only when the value shown changes
+        self.music_label = CachedText(36)
+        self.sfx_label = CachedText(36)
 
         # Title Label (stored as (text_str, text_surf, rect))
         title_text_str = "Settings"
@@ -268,12 +331,10 @@ class SettingsScreen_Pygame(PygameScreen):
         screen.fill((0, 0, 0)) # Black background
 
         # Render and blit dynamic labels (Music and SFX volume)
-        current_music_text = f"Music Volume: {self.app.music_volume:.2f}"
-        music_text_surf = self.label_font.render(current_music_text, True, (255, 255, 255))
+        music_text_surf = self.music_label.render(f"Music Volume: {self.app.music_volume:.2f}")
         screen.blit(music_text_surf, self.music_label_rect)
 
-        current_sfx_text = f"SFX Volume: {self.app.sfx_volume:.2f}"
-        sfx_text_surf = self.label_font.render(current_sfx_text, True, (255, 255, 255))
+        sfx_text_surf = self.sfx_label.render(f"SFX Volume: {self.app.sfx_volume:.2f}")
         screen.blit(sfx_text_surf, self.sfx_label_rect)
         
         # Draw static labels (like "Settings" title)
@@ -310,15 +371,15 @@ class SettingsScreen_Pygame(PygameScreen):
     def on_music_volume_change(self, slider, value):
         self.app.music_volume = value
         pygame.mixer.music.set_volume(value)
-        print(f"Music Volume: {value:.2f}")
+        log.debug("Music Volume: %.2f", value)
 
     def on_sfx_volume_change(self, slider, value):
         self.app.sfx_volume = value
-        # In a real game, you'd set volume for all active sound effects or future ones
-        print(f"SFX Volume: {value:.2f}")
+        SoundBank.set_volume(value) # Applies to playing and future sound effects
+        log.debug("SFX Volume: %.2f", value)
 
     def go_back(self):
-        print("Settings screen: Back pressed.")
+        log.debug("Settings screen: Back pressed.")
         self.app.save_game_data() # Save settings when going back
         # Go back to the previous screen (menu or pause)
         if self.app.root._previous_screen:
@@ -332,25 +393,29 @@ class GameScreen_Pygame(PygameScreen):
         super().__init__(name, app_ref)
         self.game_widget = game_widget # GameWidget instance is passed in
         # Add background image directly to this screen if it's static
-        self.background_image = None
-        background_path = get_asset_path("background.png")
-        if os.path.exists(background_path):
-            try:
-                self.background_image = pygame.image.load(background_path).convert()
-                self.background_image = pygame.transform.scale(self.background_image, (self.app.screen_width, self.app.screen_height))
-            except pygame.error as e:
-                print(f"Error loading background image {background_path}: {e}")
-        else:
-            print(f"Background image file not found: {background_path}")
+        # (decoded by the asset preloader; ImageCache loads it here if it was not)
+        self.background_image = ImageCache.get_opaque("background.png", (self.app.screen_width, self.app.screen_height))
 
 
     def draw(self, screen):
-        if self.background_image:
-            screen.blit(self.background_image, (0,0))
-        else:
-            screen.fill((0, 0, 0)) # Default black if no background
-
-        self.game_widget.draw(screen) # Draw the game content
+        """Draws the game. Returns the dirty rects to update, or None for a full flip."""
+        renderer = getattr(self.app, 'renderer', None)
+        if renderer is None or renderer.needs_full_redraw or self.game_widget.game_over_visible:
+            if self.background_image:
+                screen.blit(self.background_image, (0,0))
+            else:
+                screen.fill((0, 0, 0)) # Default black if no background
+
+            drawn_rects = self.game_widget.draw(screen) # Draw the game content
+            if renderer:
+                renderer.reset(drawn_rects)
+                if self.game_widget.game_over_visible:
+                    renderer.invalidate() # The overlay covers everything; stay on full redraws
+            return None
+
+        # Dirty-rect path: erase last frame's sprites, redraw, update only those areas
+        renderer.restore(screen, self.background_image)
+        return renderer.commit(self.game_widget.draw(screen))
 
     def update(self, dt):
         self.game_widget.update(dt) # Update game logic
@@ -362,6 +427,9 @@ class GameScreen_Pygame(PygameScreen):
 
     def on_enter(self):
         super().on_enter()
+        # Other screens drew over the frame buffer; the next game frame must be complete
+        if getattr(self.app, 'renderer', None):
+            self.app.renderer.invalidate()
         # GameWidget.start_game is called by PygameScreenManager.current.setter
         # when screen is set to 'game'
         pass
@@ -381,7 +449,7 @@ class PauseScreen_Pygame(PygameScreen):
         center_x = self.app.screen_width / 2
 
         # Title Label
-        title_font = pygame.font.Font(None, 60)
+        title_font = FontCache.get(60)
         title_text_str = "PAUSED"
         title_text_surf = title_font.render(title_text_str, True, (255, 255, 255))
         title_rect = title_text_surf.get_rect(center=(center_x, self.app.screen_height * 0.7))
@@ -393,10 +461,8 @@ class PauseScreen_Pygame(PygameScreen):
         self.buttons.append(PygameButton("Exit to Main Menu", (center_x - button_width/2, self.app.screen_height * 0.2 - button_height/2, button_width, button_height), self.exit_to_menu))
 
     def draw(self, screen):
-        # Draw a semi-transparent overlay
-        s = pygame.Surface((self.app.screen_width, self.app.screen_height), pygame.SRCALPHA)
-        s.fill((0, 0, 0, 128)) # Semi-transparent black
-        screen.blit(s, (0,0))
+        # Draw a semi-transparent overlay (built once, shared)
+        screen.blit(OverlayCache.get((self.app.screen_width, self.app.screen_height)), (0,0))
 
         # Draw labels and buttons on top
         for text_str, text_surface, rect in self.labels:
@@ -406,15 +472,15 @@ class PauseScreen_Pygame(PygameScreen):
 
     # These methods are correctly defined here as part of the class
     def resume_game(self):
-        print("Pause screen: Resume Game pressed.")
+        log.debug("Pause screen: Resume Game pressed.")
         self.app.root.current = 'game'
 
     def open_settings(self):
-        print("Pause screen: Settings pressed.")
+        log.debug("Pause screen: Settings pressed.")
         self.app.root._previous_screen = self.name # Store current screen to return to it
         self.app.root.current = 'settings'
 
     def exit_to_menu(self):
-        print("Pause screen: Exit to Main Menu pressed.")
-        self.app.root.screens['game'].game_widget.end_game() # Ensure game state is reset
+        log.debug("Pause screen: Exit to Main Menu pressed.")
+        self.app.root.game_widget.end_game() # Ensure game state is reset
         self.app.root.current = 'menu' # Change screen to main menu
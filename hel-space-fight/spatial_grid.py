@@ -0,0 +1,135 @@
+class UniformGrid:
+    """Uniform-grid broadphase (spatial hash) for axis-aligned rectangles.
+
+    Objects are bucketed by every cell their rect overlaps. A query only looks
+    at the cells its own rect overlaps, so collision cost follows local density
+    instead of growing with bullets x enemies. The grid is cheap to rebuild, so
+    callers clear and refill it once per frame.
+    """
+    def __init__(self, cell_size=100):
+        self.cell_size = cell_size
+        self._cells = {} # (cx, cy) -> list of (obj, rect)
+        self.pairs_tested = 0 # Candidate pairs returned by query() since the last clear()
+
+    def clear(self):
+        self._cells.clear()
+        self.pairs_tested = 0
+
+    def _cell_range(self, rect):
+        cs = self.cell_size
+        x0 = int(rect[0] // cs)
+        y0 = int(rect[1] // cs)
+        x1 = int((rect[0] + rect[2]) // cs)
+        y1 = int((rect[1] + rect[3]) // cs)
+        return x0, y0, x1, y1
+
+    def insert(self, obj, rect):
+        x0, y0, x1, y1 = self._cell_range(rect)
+        entry = (obj, rect)
+        cells = self._cells
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                bucket = cells.get((cx, cy))
+                if bucket is None:
+                    cells[(cx, cy)] = [entry]
+                else:
+                    bucket.append(entry)
+
+    def insert_moving(self, objects):
+        """Buckets entities by the box they swept over their last step.
+
+        Entries are (obj, (start rect, (dx, dy))), ready for sweep_interval.
+        """
+        cs = self.cell_size
+        cells = self._cells
+        get = cells.get
+        for obj in objects:
+            prev, pos, size = obj._prev_pos, obj._pos, obj._size
+            x, y, new_x, new_y, w, h = prev[0], prev[1], pos[0], pos[1], size[0], size[1]
+            entry = (obj, ((x, y, w, h), (new_x - x, new_y - y)))
+            if new_x < x:
+                x, new_x = new_x, x
+            if new_y < y:
+                y, new_y = new_y, y
+            x0 = int(x // cs)
+            x1 = int((new_x + w) // cs)
+            for cy in range(int(y // cs), int((new_y + h) // cs) + 1):
+                for cx in range(x0, x1 + 1):
+                    bucket = get((cx, cy))
+                    if bucket is None:
+                        cells[(cx, cy)] = [entry]
+                    else:
+                        bucket.append(entry)
+
+    def query(self, rect):
+        """Returns the unique (obj, rect) entries sharing a cell with `rect`."""
+        x0, y0, x1, y1 = self._cell_range(rect)
+        cells = self._cells
+        if x0 == x1 and y0 == y1: # Fast path: query fits in a single cell
+            found = cells.get((x0, y0), ())
+            self.pairs_tested += len(found)
+            return found
+
+        found = []
+        seen = set()
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                for entry in cells.get((cx, cy), ()):
+                    key = id(entry[0])
+                    if key not in seen:
+                        seen.add(key)
+                        found.append(entry)
+        self.pairs_tested += len(found)
+        return found
+
+
+def sweep_interval(a_rect, a_delta, b_rect, b_delta):
+    """(t_enter, t_exit): the part of one step during which two moving boxes overlap, or None.
+
+    `a_rect`/`b_rect` are (x, y, w, h) at the start of the step and
+    `a_delta`/`b_delta` how far each box moves during it. Works on the
+    relative motion of a against b with the slab method.
+    """
+    t_enter = 0.0
+    t_exit = 1.0
+    for axis in (0, 1):
+        a_lo = a_rect[axis]
+        a_hi = a_lo + a_rect[axis + 2]
+        b_lo = b_rect[axis]
+        b_hi = b_lo + b_rect[axis + 2]
+        d = a_delta[axis] - b_delta[axis]
+        if d == 0.0:
+            if a_hi <= b_lo or a_lo >= b_hi:
+                return None # Separated on this axis for the whole step
+            continue
+        t0 = (b_lo - a_hi) / d
+        t1 = (b_hi - a_lo) / d
+        if t0 > t1:
+            t0, t1 = t1, t0
+        if t0 > t_enter:
+            t_enter = t0
+        if t1 < t_exit:
+            t_exit = t1
+        if t_enter >= t_exit:
+            return None
+    return t_enter, t_exit
+
+
+def sweep_masks(a_mask, a_pos, a_delta, b_mask, b_pos, b_delta, interval, max_step=4.0):
+    """First time within `interval` at which two moving masks overlap, or None.
+
+    Only meant for pairs whose boxes already meet (see sweep_interval): the
+    overlap part of the step is sampled so that the relative motion between
+    two samples is at most `max_step` pixels.
+    """
+    t_enter, t_exit = interval
+    span = t_exit - t_enter
+    distance = max(abs(a_delta[0] - b_delta[0]), abs(a_delta[1] - b_delta[1])) * span
+    samples = int(distance / max_step) + 1
+    for i in range(samples + 1):
+        t = t_enter + span * i / samples
+        offset = (int(b_pos[0] + b_delta[0] * t) - int(a_pos[0] + a_delta[0] * t),
+                  int(b_pos[1] + b_delta[1] * t) - int(a_pos[1] + a_delta[1] * t))
+        if a_mask.overlap(b_mask, offset):
+            return t
+    return None
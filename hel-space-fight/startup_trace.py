@@ -0,0 +1,55 @@
+import sys
+import time
+from contextlib import contextmanager
+
+
+class StartupTrace:
+    """Times the import and init steps of a launch (`main_pygame.py --startup-trace`).
+
+    Wrap each step in `with trace.step(name):`; report() prints how long every
+    step took, how many modules it imported and the total time to the first
+    frame. Steps that run later on first use (screens, the game widget) are
+    printed as they happen. When disabled, step() does nothing.
+    """
+    def __init__(self, enabled=False, stream=None):
+        self.enabled = enabled
+        self.stream = stream or sys.stderr
+        self.started = time.perf_counter()
+        self.steps = [] # (name, seconds, modules imported)
+        self.reported = False
+        self._depth = 0
+
+    @contextmanager
+    def step(self, name):
+        if not self.enabled:
+            yield
+            return
+        index = len(self.steps)
+        self.steps.append(None) # Reserve the slot so nested steps list after their parent
+        modules = len(sys.modules)
+        started = time.perf_counter()
+        self._depth += 1
+        try:
+            yield
+        finally:
+            self._depth -= 1
+            self.steps[index] = ('  ' * self._depth + name, time.perf_counter() - started,
+                                 len(sys.modules) - modules)
+            if self.reported and self._depth == 0:
+                for entry in self.steps[index:]: # Deferred step, after the startup report
+                    self._print_step(entry)
+
+    def report(self, label="first frame"):
+        """Prints every step so far and the total time since the trace was created."""
+        if not self.enabled or self.reported:
+            return
+        self.reported = True
+        print("Startup trace (ms, modules imported):", file=self.stream)
+        for entry in self.steps:
+            self._print_step(entry)
+        total = (time.perf_counter() - self.started) * 1000.0
+        print(f"{total:9.1f}        total to {label}", file=self.stream)
+
+    def _print_step(self, entry):
+        name, seconds, modules = entry
+        print(f"{seconds * 1000.0:9.1f} {modules:6d} {name}", file=self.stream)
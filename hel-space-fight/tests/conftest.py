@@ -0,0 +1,15 @@
+import os
+import sys
+
+import pytest
+
+GAME_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, GAME_DIR) # The game's modules are flat files next to this directory
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+
+@pytest.fixture(autouse=True)
+def game_dir(monkeypatch):
+    monkeypatch.chdir(GAME_DIR) # Asset paths are relative to the game directory
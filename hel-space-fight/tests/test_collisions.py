@@ -0,0 +1,16 @@
+import pytest
+
+from array_store import array_store_available
+from entities_pygame import FireRatePowerUp
+from headless_pygame import create_game, init_headless
+
+
+@pytest.mark.parametrize('use_array_store', [
+    False, pytest.param(True, marks=pytest.mark.skipif(not array_store_available(), reason="needs NumPy"))])
+def test_direct_check_collisions_picks_up_overlapping_powerup(use_array_store):
+    init_headless()
+    game = create_game(seed=1, use_array_store=use_array_store)
+    powerup = game.spawn_entity(FireRatePowerUp, tuple(game.player.pos))
+    game.check_collisions() # Outside update(): the removal must not happen mid-iteration
+    assert powerup not in game.entities
+    assert not len(game.entity_commands)
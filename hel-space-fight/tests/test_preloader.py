@@ -0,0 +1,18 @@
+import pygame
+
+import preloader
+from preloader import AssetPreloader
+
+
+def test_failing_final_step_still_finishes_the_preloader(monkeypatch):
+    pygame.display.init()
+    pygame.display.set_mode((800, 600))
+
+    def fail(*args):
+        raise RuntimeError("atlas failed")
+    monkeypatch.setattr(preloader.SpriteAtlas, 'build', fail)
+
+    assets = AssetPreloader((800, 600))
+    assets.wait(timeout=10)
+    assert assets.done
+    assert assets.progress == 1.0
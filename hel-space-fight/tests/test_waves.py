@@ -0,0 +1,58 @@
+import pytest
+
+from array_store import array_store_available
+from game_core_pygame import GameWidget_Pygame
+from headless_pygame import HeadlessApp, init_headless
+import waves
+from waves import DEFAULT_WAVES, load_wave_definitions, validate_wave_definitions
+
+
+def formation_waves(formation, count=5):
+    return {"spawn_budget": count, "waves": [
+        {"name": formation, "interval": 0.1, "count": count, "formation": formation,
+         "mix": {"Enemy": 1.0}, "powerup_chance": 0.0},
+    ]}
+
+
+def run_first_group(formation, use_array_store):
+    init_headless()
+    game = GameWidget_Pygame(HeadlessApp(), use_array_store=use_array_store, waves=formation_waves(formation))
+    game.start_game(seed=1)
+    for _ in range(10): # One group at 0.1 s, built in the same step
+        game.update(1 / 60)
+    return game
+
+
+@pytest.mark.skipif(not array_store_available(), reason="needs NumPy")
+@pytest.mark.parametrize('formation', ['column', 'v'])
+def test_formation_spawned_above_screen_survives_in_array_store(formation):
+    per_entity = run_first_group(formation, use_array_store=False)
+    array = run_first_group(formation, use_array_store=True)
+    assert per_entity.wave_director.spawned == array.wave_director.spawned == 5
+    assert len(array.entities.group('enemies')) == len(per_entity.entities.group('enemies')) == 5
+    assert ([enemy.pos for enemy in array.entities.group('enemies')] ==
+            pytest.approx([enemy.pos for enemy in per_entity.entities.group('enemies')]))
+
+
+@pytest.mark.parametrize('field, value', [('interval', "2"), ('count', 2.5), ('spacing', None), ('count', True)])
+def test_wrongly_typed_wave_fields_are_rejected(field, value):
+    definitions = formation_waves('line')
+    definitions['waves'][0][field] = value
+    with pytest.raises(ValueError):
+        validate_wave_definitions(definitions)
+
+
+def test_invalid_wave_file_falls_back_to_default_waves(tmp_path, monkeypatch):
+    path = tmp_path / 'waves.json'
+    path.write_text('{"waves": [{"interval": "2", "mix": {"Enemy": 1}}]}')
+    monkeypatch.setattr(waves, 'get_asset_path', lambda filename: str(path))
+    assert load_wave_definitions() is DEFAULT_WAVES
+
+
+@pytest.mark.parametrize('field, value', [('groups', 0), ('groups', -2), ('powerup_chance', -0.1),
+                                          ('powerup_chance', 1.5), ('mix', {"Enemy": 1.0, "FastEnemy": -0.5})])
+def test_out_of_range_wave_fields_are_rejected(field, value):
+    definitions = formation_waves('line')
+    definitions['waves'][0][field] = value
+    with pytest.raises(ValueError):
+        validate_wave_definitions(definitions)
@@ -2,6 +2,10 @@
 # utils.py
 import os
 import sys
+import json
+from functools import lru_cache
+
+from game_log import get_logger
 
 def get_asset_path(filename):
     if hasattr(sys, '_MEIPASS'):
@@ -12,3 +16,22 @@ def get_asset_path(filename):
         path = os.path.join('assets', filename)
     # print(f"DEBUG: Attempting to load asset: {path}") # Keep for debugging if needed
     return path
+
+def get_user_data_path(filename, app_name='hel-space-fight'):
+    """Per-user, writable location for saves ($XDG_DATA_HOME/hel-space-fight, %APPDATA% on Windows)."""
+    if sys.platform == 'win32':
+        base = os.environ.get('APPDATA') or os.path.expanduser('~')
+    else:
+        base = os.environ.get('XDG_DATA_HOME') or os.path.join(os.path.expanduser('~'), '.local', 'share')
+    return os.path.join(base, app_name, filename)
+
+@lru_cache(maxsize=None)
+def load_asset_manifest(filename='manifest.json'):
+    """Parsed assets/manifest.json: the images (with their target sizes), animations and sounds to preload."""
+    path = get_asset_path(filename)
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        get_logger('assets').warning("Could not read asset manifest %s: %s. Assets will load on first use.", path, e)
+        return {}
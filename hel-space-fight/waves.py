@@ -0,0 +1,196 @@
+import json
+from collections import deque
+
+from utils import get_asset_path
+from entities_pygame import Enemy, FastEnemy, ArmoredEnemy, FireRatePowerUp
+from game_log import get_logger
+
+log = get_logger('waves')
+
+# Names usable in a wave's "mix" and "powerup" fields
+ENEMY_TYPES = {cls.__name__: cls for cls in (Enemy, FastEnemy, ArmoredEnemy)}
+POWERUP_TYPES = {cls.__name__: cls for cls in (FireRatePowerUp,)}
+FORMATIONS = ('random', 'line', 'column', 'v')
+
+# Used when assets/waves.json is missing or invalid: one enemy every 2 seconds, forever
+DEFAULT_WAVES = {
+    "spawn_budget": 4,
+    "waves": [
+        {"name": "trickle", "interval": 2.0, "count": 1, "formation": "random",
+         "mix": {"Enemy": 0.6, "FastEnemy": 0.3, "ArmoredEnemy": 0.1},
+         "powerup": "FireRatePowerUp", "powerup_chance": 0.15},
+    ],
+}
+
+
+def load_wave_definitions(filename='waves.json'):
+    """Reads and validates assets/waves.json, falling back to DEFAULT_WAVES."""
+    path = get_asset_path(filename)
+    try:
+        with open(path, 'r') as f:
+            definitions = json.load(f)
+        validate_wave_definitions(definitions)
+        return definitions
+    except (OSError, json.JSONDecodeError, ValueError, TypeError) as e:
+        log.warning("Could not read wave definitions %s: %s. Using the default waves.", path, e)
+        return DEFAULT_WAVES
+
+
+def _is_int(value):
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def validate_wave_definitions(definitions):
+    """Raises ValueError naming the first problem found."""
+    if not isinstance(definitions, dict):
+        raise ValueError("wave definitions must be an object")
+    waves = definitions.get('waves')
+    if not waves or not isinstance(waves, list):
+        raise ValueError("no waves defined")
+    for key in ('spawn_budget', 'loop_from'):
+        if key in definitions and not _is_int(definitions[key]):
+            raise ValueError(f"{key} must be an integer")
+    if definitions.get('spawn_budget', 1) < 1:
+        raise ValueError("spawn_budget must be at least 1")
+    if not 0 <= definitions.get('loop_from', len(waves) - 1) < len(waves):
+        raise ValueError("loop_from is not a wave index")
+    for i, wave in enumerate(waves):
+        if not isinstance(wave, dict):
+            raise ValueError(f"wave {i}: must be an object")
+        label = f"wave {wave.get('name', i)}"
+        for key in ('count', 'groups'):
+            if key in wave and not _is_int(wave[key]):
+                raise ValueError(f"{label}: {key} must be an integer")
+        for key in ('interval', 'spacing', 'powerup_chance'):
+            if key in wave and not _is_number(wave[key]):
+                raise ValueError(f"{label}: {key} must be a number")
+        if wave.get('interval', 0) <= 0:
+            raise ValueError(f"{label}: interval must be positive")
+        if wave.get('count', 1) < 1:
+            raise ValueError(f"{label}: count must be at least 1")
+        if wave.get('groups', 1) < 1:
+            raise ValueError(f"{label}: groups must be at least 1")
+        if not 0 <= wave.get('powerup_chance', 0.0) <= 1:
+            raise ValueError(f"{label}: powerup_chance must be between 0 and 1")
+        if wave.get('formation', 'random') not in FORMATIONS:
+            raise ValueError(f"{label}: unknown formation {wave['formation']!r}")
+        if not isinstance(wave.get('mix'), dict):
+            raise ValueError(f"{label}: mix must map enemy types to weights")
+        for name, weight in wave['mix'].items():
+            if name not in ENEMY_TYPES:
+                raise ValueError(f"{label}: unknown enemy type {name!r}")
+            if not _is_number(weight):
+                raise ValueError(f"{label}: weight of {name} must be a number")
+            if weight < 0:
+                raise ValueError(f"{label}: weight of {name} must not be negative")
+        if not any(weight > 0 for weight in wave['mix'].values()):
+            raise ValueError(f"{label}: mix needs at least one positive weight")
+        if wave.get('powerup', 'FireRatePowerUp') not in POWERUP_TYPES:
+            raise ValueError(f"{label}: unknown power-up type {wave['powerup']!r}")
+
+
+class WaveDirector:
+    """Spawns enemies and power-ups for GameWidget_Pygame from data-driven waves.
+
+    Each wave spawns a group of `count` enemies every `interval` seconds in a
+    formation, with enemy types drawn from its weighted `mix` and a
+    `powerup_chance` of also dropping a power-up. After `groups` groups
+    (forever if omitted) the next wave starts; after the last one the
+    director loops back to wave `loop_from` (default: the last wave).
+
+    Groups are planned all at once but built over several frames: at most
+    `spawn_budget` entities are constructed per update, so a dense wave never
+    turns into a one-frame spike. Spawns built late are moved along their
+    velocity by the time they waited, which keeps formations intact.
+    All randomness comes from the game's seeded RNG, in a fixed order, so
+    replays stay deterministic.
+    """
+    def __init__(self, game, definitions=None, spawn_budget=None):
+        self.game = game
+        self.definitions = definitions if definitions is not None else load_wave_definitions()
+        self.waves = self.definitions['waves']
+        self.loop_from = self.definitions.get('loop_from', len(self.waves) - 1)
+        self.spawn_budget = spawn_budget or self.definitions.get('spawn_budget', 4)
+        self._pending = deque() # (entity class, (x, y), planned at time) waiting for budget
+        self.reset()
+
+    @property
+    def wave(self):
+        return self.waves[self.wave_index]
+
+    @property
+    def pending(self):
+        return len(self._pending)
+
+    def reset(self):
+        self.wave_index = 0
+        self.groups_spawned = 0 # In the current wave
+        self.time = 0.0
+        self._timer = 0.0
+        self._pending.clear()
+        self.spawned = 0 # Entities built since the game started
+        self.max_spawned_per_frame = 0 # Largest number built in one update
+
+    def update(self, dt):
+        self.time += dt
+        self._timer += dt
+        if self._timer >= self.wave['interval']:
+            self._plan_group(self.wave)
+            self._timer = 0.0
+            self.groups_spawned += 1
+            groups = self.wave.get('groups')
+            if groups is not None and self.groups_spawned >= groups:
+                self._next_wave()
+
+        built = 0
+        pending = self._pending
+        while pending and built < self.spawn_budget:
+            entity_class, pos, planned_at = pending.popleft()
+            self.game.spawn_entity(entity_class, pos, lag=self.time - planned_at)
+            built += 1
+        self.spawned += built
+        self.max_spawned_per_frame = max(self.max_spawned_per_frame, built)
+
+    def _next_wave(self):
+        self.wave_index = self.wave_index + 1 if self.wave_index + 1 < len(self.waves) else self.loop_from
+        self.groups_spawned = 0
+
+    def _plan_group(self, wave):
+        rng = self.game.rng
+        screen_width = self.game.app.screen_width
+        names = list(wave['mix'])
+        weights = [wave['mix'][name] for name in names]
+        count = wave.get('count', 1)
+        formation = wave.get('formation', 'random')
+        spacing = wave.get('spacing', 10)
+        width, height = Enemy.default_size
+
+        if formation == 'column': # One x for the whole group, stacked above the screen
+            column_x = rng.randint(0, screen_width - width)
+        elif formation == 'v': # Leader at the apex, the others alternating left and right behind it
+            apex_x = rng.randint(0, screen_width - width)
+        for i in range(count):
+            entity_class = ENEMY_TYPES[rng.choices(names, weights=weights, k=1)[0]]
+            if formation == 'random':
+                x, y = rng.randint(0, screen_width - width), -height
+            elif formation == 'line': # Evenly spread across the screen
+                slot = screen_width / count
+                x, y = slot * i + (slot - width) / 2, -height
+            elif formation == 'column':
+                x, y = column_x, -height - i * (height + spacing)
+            else:
+                rank = (i + 1) // 2
+                side = -1 if i % 2 else 1
+                x, y = apex_x + side * rank * (width / 2 + spacing), -height - rank * (height / 2 + spacing)
+            x = max(0, min(x, screen_width - width)) # Keep wide formations on screen
+            self._pending.append((entity_class, (x, y), self.time))
+
+        if rng.random() < wave.get('powerup_chance', 0.0):
+            powerup_class = POWERUP_TYPES[wave.get('powerup', 'FireRatePowerUp')]
+            powerup_width, powerup_height = powerup_class.default_size
+            self._pending.append((powerup_class, (rng.randint(0, screen_width - powerup_width), -powerup_height),
+                                  self.time))